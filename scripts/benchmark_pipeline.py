@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Result file, stressor and energy flag of every stress-ng test
+STRESS_NG_FIXTURES = [
+    ("cpu_single", "cpu", True),
+    ("cpu_multi", "cpu", True),
+    ("cpu_all", "cpu", True),
+    ("mem_single", "vm", True),
+    ("mem_multi", "vm", True),
+    ("disk_write_test", "hdd", False),
+    ("disk_io_test", "iomix", False),
+    ("disk_fallocate_test", "fallocate", False),
+]
+
+# Scenes and options of the default glmark2 benchmark
+GLMARK2_SCENES = [
+    ("build", "use-vbo=false"),
+    ("build", "use-vbo=true"),
+    ("texture", "texture-filter=nearest"),
+    ("texture", "texture-filter=linear"),
+    ("texture", "texture-filter=mipmap"),
+    ("shading", "shading=gouraud"),
+    ("shading", "shading=blinn-phong-inf"),
+    ("shading", "shading=phong"),
+    ("shading", "shading=cel"),
+    ("bump", "bump-render=high-poly"),
+    ("bump", "bump-render=normals"),
+    ("bump", "bump-render=height"),
+    ("effect2d", "kernel=0,1,0;1,-4,1;0,1,0;"),
+    ("effect2d", "kernel=1,1,1,1,1;1,1,1,1,1;1,1,1,1,1;"),
+    ("pulsar", "light=false:quads=5:texture=false"),
+    ("desktop", "blur-radius=5:effect=blur:passes=1:separable=true:windows=4"),
+    ("desktop", "effect=shadow:windows=4"),
+    (
+        "buffer",
+        "columns=200:interleave=false:update-dispersion=0.9:update-fraction=0.5"
+        ":update-method=map",
+    ),
+    ("ideas", "speed=duration"),
+    ("jellyfish", "<default>"),
+    ("terrain", "<default>"),
+    ("shadow", "<default>"),
+    ("refract", "<default>"),
+    ("conditionals", "fragment-steps=0:vertex-steps=0"),
+    ("conditionals", "fragment-steps=5:vertex-steps=0"),
+    ("function", "fragment-complexity=low:fragment-steps=5"),
+    ("loop", "fragment-loop=false:fragment-steps=5:vertex-steps=5"),
+]
+
+CASES = [
+    "extract_gpu_data",
+    "parse_glmark2_output",
+    "get_bogo_ops",
+    "generate_plots",
+    "generate_report",
+]
+
+# Optional packages per case, the case is skipped when one is not installed.
+# Any other failure, including an ImportError, fails the benchmark.
+OPTIONAL_DEPENDENCIES = {
+    "get_bogo_ops": ["matplotlib"],
+    "generate_plots": ["matplotlib"],
+}
+
+# Seconds below which timing differences are treated as noise
+MIN_SIGNIFICANT_SECONDS = 0.05
+
+
+def _write_until(path, header, lines, footer, size_bytes):
+    """Write header, then cycle through lines until size_bytes, then footer"""
+    written = 0
+    with open(path, "w") as f:
+        written += f.write(header)
+        while written < size_bytes:
+            chunk = "".join(next(lines) for _ in range(1000))
+            written += f.write(chunk)
+        f.write(footer)
+
+
+def write_stress_ng_yaml(path, stressor, rng, entries=1):
+    """
+    Write a stress-ng YAML result with the given number of metrics entries
+
+    Padding entries come first so parsers have to scan the whole list.
+    """
+    bogo_ops = rng.randint(10000, 10000000)
+    seconds = 60.0
+    lines = [
+        "---",
+        "system-info:",
+        "      stress-ng-version: 0.17.06",
+        "      run-by: benchmark",
+        "      date-yyyy-mm-dd: 2024:01:01",
+        "      time-hh-mm-ss: 12:00:00",
+        "      epoch-secs: 1704110400",
+        "      hostname: benchmark-host",
+        "      sysname: Linux",
+        "      cpus: 16",
+        "      cpus-online: 16",
+        "      ticks-per-second: 100",
+        "",
+        "metrics:",
+    ]
+    for i in range(entries):
+        name = stressor if i == entries - 1 else f"{stressor}-pad{i}"
+        ops = bogo_ops if i == entries - 1 else rng.randint(1, 1000)
+        lines += [
+            f"    - stressor: {name}",
+            f"      bogo-ops: {ops}",
+            f"      bogo-ops-per-second-usr-sys-time: {ops / seconds * 0.98:.6f}",
+            f"      bogo-ops-per-second-real-time: {ops / seconds:.6f}",
+            f"      wall-clock-time: {seconds:.6f}",
+            f"      user-time: {seconds * 0.97:.6f}",
+            f"      system-time: {seconds * 0.02:.6f}",
+            "      cpu-usage-per-instance: 99.500000",
+            f"      max-rss: {rng.randint(4000, 400000)}",
+        ]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n...\n")
+
+
+def write_energy_json(path, rng):
+    package = rng.uniform(500, 5000)
+    dram = rng.uniform(50, 500)
+    energy = {
+        "available": True,
+        "duration_s": 60.0,
+        "domains": {"package-0": package, "dram-0": dram},
+        "package_joules": package,
+        "dram_joules": dram,
+        "total_joules": package + dram,
+        "avg_power_w": (package + dram) / 60.0,
+    }
+    with open(path, "w") as f:
+        json.dump(energy, f, indent=2)
+
+
+def write_gpu_burn_log(path, size_bytes, rng):
+    """Write a gpu_burn log of roughly size_bytes"""
+
+    def lines():
+        percent = 0.0
+        while True:
+            percent = min(percent + 0.1, 100.0)
+            yield (
+                f"{percent:.1f}%  proc'd: {rng.randint(1000, 90000)} "
+                f"({rng.randint(9000, 15000)} Gflop/s)   errors: 0   "
+                f"temps: {rng.randint(45, 85)} C \n"
+            )
+
+    header = "GPU 0: NVIDIA GeForce RTX 3080 (UUID: GPU-benchmark)\n"
+    header += "Initialized device 0 with 10240 MB of memory\n"
+    footer = "\nKilling processes.. done\n\nTested 1 GPUs:\n\tGPU 0: OK\n"
+    _write_until(path, header, lines(), footer, size_bytes)
+
+
+def glmark2_scene_list(count):
+    """Default glmark2 scenes, extended with option variants up to count"""
+    scenes = list(GLMARK2_SCENES)
+    variant = 0
+    while len(scenes) < count:
+        scene, options = GLMARK2_SCENES[variant % len(GLMARK2_SCENES)]
+        options = "" if options == "<default>" else options + ":"
+        scenes.append((scene, f"{options}variant={variant}"))
+        variant += 1
+    return scenes[:count]
+
+
+def write_glmark2_log(path, size_bytes, rng, scene_count=len(GLMARK2_SCENES)):
+    """Write a glmark2 log of roughly size_bytes, repeating whole runs"""
+    scenes = glmark2_scene_list(scene_count)
+    separator = "=" * 55 + "\n"
+
+    def lines():
+        while True:
+            for scene, options in scenes:
+                fps = rng.randint(100, 5000)
+                yield (
+                    f"[{scene}] {options}: FPS: {fps} "
+                    f"FrameTime: {1000 / fps:.3f} ms\n"
+                )
+            yield separator
+            yield f"{'glmark2 Score: ' + str(rng.randint(1000, 4000)):>49} \n"
+            yield separator
+
+    header = separator
+    header += "    glmark2 2023.01\n"
+    header += separator
+    header += "    OpenGL Information\n"
+    header += "    GL_VENDOR:      Benchmark Vendor\n"
+    header += "    GL_RENDERER:    Benchmark Renderer\n"
+    header += "    GL_VERSION:     4.6 (Compatibility Profile) Mesa 23.0.4\n"
+    header += "    Surface Config: buf=32 r=8 g=8 b=8 a=8 depth=24 stencil=0\n"
+    header += "    Surface Size:   800x600 windowed\n"
+    header += separator
+    _write_until(path, header, lines(), "", size_bytes)
+
+
+def generate_fixtures(workdir, config):
+    """
+    Generate a synthetic report directory and copies of its stress-ng results
+
+    Returns:
+        str: The report directory inside workdir
+    """
+    from extract_glmark2_data import extract_plot_data, parse_glmark2_output
+    from extract_gpu_data import extract_gpu_data, save_csv_data
+
+    rng = random.Random(config["seed"])
+    report_dir = os.path.join(workdir, "report")
+    results_dir = os.path.join(report_dir, "results")
+    os.makedirs(results_dir, exist_ok=True)
+
+    for test, stressor, has_energy in STRESS_NG_FIXTURES:
+        write_stress_ng_yaml(
+            f"{results_dir}/{test}.yaml", stressor, rng, config["yaml_entries"]
+        )
+        if has_energy:
+            write_energy_json(f"{results_dir}/{test}_energy.json", rng)
+
+    write_gpu_burn_log(f"{results_dir}/gpu_burn.log", config["gpu_log_mb"] << 20, rng)
+    write_glmark2_log(
+        f"{results_dir}/glmark2.log",
+        config["glmark2_log_mb"] << 20,
+        rng,
+        config["glmark2_scenes"],
+    )
+
+    # Derived files the plots and report read, as the pipeline writes them
+    data, result = extract_gpu_data(f"{results_dir}/gpu_burn.log")
+    save_csv_data(data, result, f"{results_dir}/gpu_burn_data.csv")
+    glmark2_data = parse_glmark2_output(f"{results_dir}/glmark2.log")
+    with open(f"{results_dir}/glmark2_data.json", "w") as f:
+        json.dump(glmark2_data, f, indent=2)
+    with open(f"{results_dir}/glmark2_plot_data.json", "w") as f:
+        json.dump(extract_plot_data(glmark2_data), f, indent=2)
+
+    # Many finished runs, as in an archive of results directories
+    runs_dir = os.path.join(workdir, "runs")
+    for i in range(config["result_dirs"]):
+        run_dir = os.path.join(runs_dir, f"run-{i:05d}")
+        os.makedirs(run_dir, exist_ok=True)
+        for test, _, _ in STRESS_NG_FIXTURES:
+            shutil.copyfile(f"{results_dir}/{test}.yaml", f"{run_dir}/{test}.yaml")
+
+    with open(os.path.join(workdir, "fixtures.json"), "w") as f:
+        json.dump(config, f, indent=2)
+    return report_dir
+
+
+def fixtures_match(workdir, config):
+    try:
+        with open(os.path.join(workdir, "fixtures.json"), "r") as f:
+            return json.load(f) == config
+    except (OSError, ValueError):
+        return False
+
+
+def run_case(case, workdir):
+    """Run one benchmark case in this process, output is discarded"""
+    report_dir = os.path.join(workdir, "report")
+    results_dir = os.path.join(report_dir, "results")
+
+    if case == "extract_gpu_data":
+        from extract_gpu_data import extract_gpu_data
+
+        extract_gpu_data(f"{results_dir}/gpu_burn.log")
+    elif case == "parse_glmark2_output":
+        from extract_glmark2_data import parse_glmark2_output
+
+        parse_glmark2_output(f"{results_dir}/glmark2.log")
+    elif case == "get_bogo_ops":
+        from plot_data import get_bogo_ops
+
+        runs_dir = os.path.join(workdir, "runs")
+        for run in sorted(os.listdir(runs_dir)):
+            for test, _, _ in STRESS_NG_FIXTURES:
+                get_bogo_ops(f"{runs_dir}/{run}/{test}.yaml")
+    elif case == "generate_plots":
+        from plot_data import generate_plots
+
+        generate_plots(report_dir, with_gpu=True)
+    elif case == "generate_report":
+        from generate_report import generate_report
+
+        generate_report(report_dir)
+    else:
+        raise ValueError(f"Unknown benchmark case '{case}'")
+
+
+def missing_dependencies(case):
+    """Optional packages the case needs that are not installed"""
+    return [
+        name
+        for name in OPTIONAL_DEPENDENCIES.get(case, [])
+        if importlib.util.find_spec(name) is None
+    ]
+
+
+def measure_case(case, workdir):
+    """
+    Run a case in a fresh interpreter so peak memory is its own
+
+    Returns:
+        dict: Elapsed seconds and peak RSS in kB, or the error if it failed
+    """
+    env = dict(os.environ)
+    # Keep benchmark runs out of any pipeline trace being recorded
+    env.pop("STRESS_TRACE_EVENTS", None)
+    env.pop("STRESS_TRACE_PROFILE", None)
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", case, workdir],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exit {process.returncode}"}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def peak_rss_kb():
+    """
+    Peak resident memory of this process in kB
+
+    VmHWM belongs to the current address space, ru_maxrss would carry over
+    the parent's peak through fork and exec.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _case_main(case, workdir):
+    # Exceptions propagate, so a failing case exits non-zero
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        run_case(case, workdir)
+        elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_rss_kb": peak_rss_kb()}))
+
+
+def compare_to_baseline(results, baseline, tolerance, memory_tolerance):
+    """
+    Find the cases that got slower or used more memory than the baseline
+
+    Returns:
+        list: Regression messages, empty when everything is within tolerance
+    """
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get("cases", {}).get(case)
+        if not base or "seconds" not in base or "seconds" not in result:
+            continue
+        limit = base["seconds"] * (1 + tolerance)
+        if (
+            result["seconds"] > limit
+            and result["seconds"] - base["seconds"] > MIN_SIGNIFICANT_SECONDS
+        ):
+            regressions.append(
+                f"{case}: {result['seconds']:.3f}s vs baseline "
+                f"{base['seconds']:.3f}s (+{tolerance:.0%} allowed)"
+            )
+        limit = base["peak_rss_kb"] * (1 + memory_tolerance)
+        if result["peak_rss_kb"] > limit:
+            regressions.append(
+                f"{case}: peak memory {result['peak_rss_kb'] / 1024:.1f} MB vs "
+                f"baseline {base['peak_rss_kb'] / 1024:.1f} MB "
+                f"(+{memory_tolerance:.0%} allowed)"
+            )
+    return regressions
+
+
+def format_results(results, baseline=None):
+    """Format the benchmark results as a text table"""
+    lines = [
+        f"{'Case':<22} {'Seconds':>10} {'Baseline':>10} {'Peak MB':>9} "
+        f"{'Baseline':>9}"
+    ]
+    for case, result in results.items():
+        if "seconds" not in result:
+            status = "skipped" if "skipped" in result else "error"
+            lines.append(f"{case:<22} {status}: {result.get(status)}")
+            continue
+        base = (baseline or {}).get("cases", {}).get(case, {})
+        base_seconds = f"{base['seconds']:.3f}" if "seconds" in base else "-"
+        base_mb = f"{base['peak_rss_kb'] / 1024:.1f}" if "peak_rss_kb" in base else "-"
+        lines.append(
+            f"{case:<22} {result['seconds']:>10.3f} {base_seconds:>10} "
+            f"{result['peak_rss_kb'] / 1024:>9.1f} {base_mb:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parsing, plotting and reporting scripts on "
+        "synthetic results"
+    )
+    parser.add_argument(
+        "--workdir",
+        help="Directory for the synthetic fixtures, reused when the sizes match "
+        "(default: a temporary directory)",
+    )
+    parser.add_argument(
+        "--gpu-log-mb", type=int, default=64, help="gpu_burn log size (default: 64)"
+    )
+    parser.add_argument(
+        "--glmark2-log-mb", type=int, default=16, help="glmark2 log size (default: 16)"
+    )
+    parser.add_argument(
+        "--glmark2-scenes",
+        type=int,
+        default=len(GLMARK2_SCENES),
+        help=f"Scenes per glmark2 run (default: {len(GLMARK2_SCENES)})",
+    )
+    parser.add_argument(
+        "--result-dirs",
+        type=int,
+        default=200,
+        help="Result directories for get_bogo_ops (default: 200)",
+    )
+    parser.add_argument(
+        "--yaml-entries",
+        type=int,
+        default=1,
+        help="Metrics entries per stress-ng YAML file (default: 1)",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per case, the fastest is kept (default: 3)",
+    )
+    parser.add_argument(
+        "--cases", nargs="+", choices=CASES, default=CASES, help="Cases to run"
+    )
+    parser.add_argument(
+        "--baseline",
+        default="benchmark_baseline.json",
+        help="Stored baseline (default: benchmark_baseline.json)",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Save the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction of the baseline (default: 0.25)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed peak memory growth as a fraction (default: 0.25)",
+    )
+    parser.add_argument("--output", "-o", help="Write the results as JSON")
+    parser.add_argument("--run-case", nargs=2, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_case:
+        _case_main(*args.run_case)
+        return
+
+    config = {
+        "gpu_log_mb": args.gpu_log_mb,
+        "glmark2_log_mb": args.glmark2_log_mb,
+        "glmark2_scenes": args.glmark2_scenes,
+        "result_dirs": args.result_dirs,
+        "yaml_entries": args.yaml_entries,
+        "seed": args.seed,
+    }
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(
+                f"Error: {args.baseline} was recorded with different fixture sizes "
+                f"{baseline.get('config')}",
+                file=sys.stderr,
+            )
+            sys.exit(2)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="stress-benchmark-")
+    try:
+        if fixtures_match(workdir, config):
+            print(f"Reusing fixtures in {workdir}")
+        else:
+            print(f"Generating fixtures in {workdir}...")
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                generate_fixtures(workdir, config)
+
+        results = {}
+        for case in args.cases:
+            missing = missing_dependencies(case)
+            if missing:
+                results[case] = {"skipped": f"{', '.join(missing)} not installed"}
+                continue
+            runs = [measure_case(case, workdir) for _ in range(args.repeat)]
+            failed = [run for run in runs if "error" in run]
+            if failed:
+                results[case] = failed[0]
+            else:
+                results[case] = {
+                    "seconds": min(run["seconds"] for run in runs),
+                    "peak_rss_kb": max(run["peak_rss_kb"] for run in runs),
+                }
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_results(results, baseline))
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "config": config,
+        "cases": results,
+    }
+    if args.output:
+        if os.path.dirname(args.output):
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    errors = [case for case, result in results.items() if "error" in result]
+    for case in errors:
+        print(f"Error: {case} failed: {results[case]['error']}", file=sys.stderr)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(1 if errors else 0)
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, store one with --update-baseline")
+        sys.exit(1 if errors else 0)
+
+    regressions = compare_to_baseline(
+        results, baseline, args.tolerance, args.memory_tolerance
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    sys.exit(1 if regressions or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
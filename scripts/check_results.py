@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import yaml
+
+from collect_sysinfo import load_inventory
+from energy import bogo_ops_per_joule, load_energy
+from extract_glmark2_data import parse_glmark2_output
+from pipeline_trace import span
+from result_files import open_result, result_exists
+
+# Result file name and display name of every stress-ng test
+STRESS_NG_TESTS = [
+    ("cpu_single", "CPU Single Core"),
+    ("cpu_multi", "CPU Multi Core"),
+    ("cpu_all", "CPU All Cores"),
+    ("mem_single", "Memory Single"),
+    ("mem_multi", "Memory Multi"),
+    ("disk_write_test", "Disk IO Write"),
+    ("disk_io_test", "Disk IO Mix"),
+    ("disk_fallocate_test", "Disk Fallocate"),
+]
+
+STRESSORS = ["cpu", "vm", "hdd", "iomix", "fallocate"]
+
+PASS = "pass"
+FAIL = "fail"
+MISSING = "missing"
+
+NO_RESULTS = "No test results found"
+
+
+def load_thresholds(config_file):
+    """
+    Load pass/fail thresholds from a YAML config file
+
+    Args:
+        config_file (str): Path to the thresholds file, may be None
+
+    Returns:
+        dict: Mapping of test id to its threshold settings
+    """
+    if not config_file:
+        return {}
+    if not os.path.exists(config_file):
+        print(f"Error: Threshold file '{config_file}' not found", file=sys.stderr)
+        sys.exit(2)
+
+    with open(config_file, "r") as f:
+        config = yaml.safe_load(f) or {}
+
+    def limits(section):
+        # A null limit means "not set", so it must not override a default
+        return {k: v for k, v in (section or {}).items() if v is not None}
+
+    defaults = limits(config.get("defaults"))
+    tests = config.get("tests", {}) or {}
+    thresholds = {}
+    for test_id, _ in STRESS_NG_TESTS:
+        thresholds[test_id] = {**defaults, **limits(tests.get(test_id))}
+    for test_id in ["gpu_burn", "glmark2"]:
+        thresholds[test_id] = limits(tests.get(test_id))
+    return thresholds
+
+
+def stress_ng_metrics(file_path):
+    """
+    Extract normalized metrics from a stress-ng YAML result file
+
+    Returns:
+        dict: Normalized metrics, or None if the file has no stressor metrics
+    """
+    with open_result(file_path) as f:
+        data = yaml.safe_load(f)
+
+    if not isinstance(data, dict) or "metrics" not in data:
+        return None
+
+    for item in data["metrics"] or []:
+        if item.get("stressor") in STRESSORS and "bogo-ops" in item:
+            return {
+                "stressor": item["stressor"],
+                "bogo_ops": item.get("bogo-ops"),
+                "bogo_ops_per_second": item.get("bogo-ops-per-second-real-time"),
+                "bogo_ops_per_second_cpu": item.get(
+                    "bogo-ops-per-second-usr-sys-time"
+                ),
+                "wall_clock_time": item.get("wall-clock-time"),
+            }
+    return None
+
+
+def gpu_burn_metrics(file_path):
+    """
+    Extract normalized metrics from a gpu_burn log
+
+    Returns:
+        dict: Normalized metrics including gflops, temperature and result
+    """
+    gflops = []
+    temps = []
+    result = "UNKNOWN"
+    with open_result(file_path) as f:
+        for line in f:
+            if "proc'd:" in line:
+                match = re.search(
+                    r"([\d.]+)%.*proc.d:.*\(([\d]+) Gflop/s\).*temps: ([\d]+) C", line
+                )
+                if match:
+                    gflops.append(float(match.group(2)))
+                    temps.append(float(match.group(3)))
+            if "OK" in line:
+                result = "PASS"
+            elif result != "PASS" and any(
+                word in line for word in ["FAILED", "ERROR", "DIED"]
+            ):
+                result = "FAIL"
+
+    return {
+        "samples": len(gflops),
+        "avg_gflops": sum(gflops) / len(gflops) if gflops else None,
+        "min_gflops": min(gflops) if gflops else None,
+        "max_temperature": max(temps) if temps else None,
+        "result": result,
+    }
+
+
+def glmark2_metrics(file_path):
+    """
+    Extract normalized metrics from a glmark2 log
+
+    Returns:
+        dict: Normalized metrics including the overall score, averaged over
+            repeated runs
+    """
+    data = parse_glmark2_output(file_path)
+    return {
+        "score": data["overall_score"],
+        "total_tests": data["summary"]["total_tests"],
+        "avg_fps": data["summary"]["avg_fps"],
+    }
+
+
+def check_limits(metrics, limits, checks):
+    """
+    Compare metrics against threshold limits
+
+    Args:
+        metrics (dict): Normalized metrics for one test
+        limits (dict): Threshold settings for the test
+        checks (list): (threshold key, metric key, is_minimum) tuples
+
+    Returns:
+        list: Human readable descriptions of every failed check
+    """
+    failures = []
+    for limit_key, metric_key, is_minimum in checks:
+        if limits.get(limit_key) is None:
+            continue
+        value = metrics.get(metric_key)
+        limit = limits[limit_key]
+        if value is None:
+            failures.append(f"{metric_key} unavailable (limit {limit})")
+        elif is_minimum and value < limit:
+            failures.append(f"{metric_key} {value:g} below minimum {limit}")
+        elif not is_minimum and value > limit:
+            failures.append(f"{metric_key} {value:g} above maximum {limit}")
+    return failures
+
+
+def evaluate_results(results_dir, thresholds=None, require_gpu=False):
+    """
+    Evaluate every test result in a results directory
+
+    Args:
+        results_dir (str): Directory containing the raw test output
+        thresholds (dict): Threshold settings keyed by test id
+        require_gpu (bool): Treat missing GPU results as failures, missing
+            stress-ng results always fail
+
+    Returns:
+        list: One result record per test
+    """
+    thresholds = thresholds or {}
+    records = []
+
+    for test_id, name in STRESS_NG_TESTS:
+        record = {"test": test_id, "name": name, "metrics": {}, "reasons": []}
+        file_path = f"{results_dir}/{test_id}.yaml"
+        if not result_exists(file_path):
+            record["status"] = FAIL
+            record["reasons"].append(NO_RESULTS)
+        else:
+            try:
+                metrics = stress_ng_metrics(file_path)
+            except Exception as e:
+                metrics = None
+                record["reasons"].append(f"Error reading results: {e}")
+            if metrics is None:
+                record["status"] = FAIL
+                if not record["reasons"]:
+                    record["reasons"].append("Failed or incomplete")
+            else:
+                energy = load_energy(f"{results_dir}/{test_id}_energy.json")
+                if energy:
+                    metrics["energy_joules"] = energy["total_joules"]
+                    metrics["avg_power_w"] = energy["avg_power_w"]
+                    metrics["bogo_ops_per_joule"] = bogo_ops_per_joule(
+                        metrics["bogo_ops"], energy
+                    )
+                record["metrics"] = metrics
+                record["reasons"] = check_limits(
+                    metrics,
+                    thresholds.get(test_id, {}),
+                    [
+                        ("min_bogo_ops", "bogo_ops", True),
+                        ("min_bogo_ops_per_second", "bogo_ops_per_second", True),
+                        ("min_bogo_ops_per_joule", "bogo_ops_per_joule", True),
+                        ("max_avg_power_w", "avg_power_w", False),
+                    ],
+                )
+                record["status"] = FAIL if record["reasons"] else PASS
+        records.append(record)
+
+    gpu_tests = [
+        ("gpu_burn", "GPU Burn Test", "gpu_burn.log", gpu_burn_metrics),
+        ("glmark2", "glmark2 Benchmark", "glmark2.log", glmark2_metrics),
+    ]
+    for test_id, name, log_name, extract in gpu_tests:
+        record = {"test": test_id, "name": name, "metrics": {}, "reasons": []}
+        file_path = f"{results_dir}/{log_name}"
+        if not result_exists(file_path):
+            record["status"] = FAIL if require_gpu else MISSING
+            record["reasons"].append(NO_RESULTS)
+            records.append(record)
+            continue
+
+        metrics = extract(file_path)
+        record["metrics"] = metrics
+        limits = thresholds.get(test_id, {})
+        if test_id == "gpu_burn":
+            if metrics["result"] != "PASS":
+                record["reasons"].append(f"gpu_burn reported {metrics['result']}")
+            record["reasons"] += check_limits(
+                metrics,
+                limits,
+                [
+                    ("min_gflops", "min_gflops", True),
+                    ("max_temperature", "max_temperature", False),
+                ],
+            )
+        else:
+            if metrics["score"] is None:
+                record["reasons"].append("No glmark2 score found")
+            record["reasons"] += check_limits(
+                metrics,
+                limits,
+                [("min_score", "score", True), ("min_avg_fps", "avg_fps", True)],
+            )
+        record["status"] = FAIL if record["reasons"] else PASS
+        records.append(record)
+
+    return records
+
+
+def write_summary(records, output_file, ndjson_file=None, host=None):
+    """
+    Save the evaluated results as JSON and optionally as NDJSON
+
+    Args:
+        host (dict): Host fingerprint from the system inventory, if collected
+    """
+    counts = {PASS: 0, FAIL: 0, MISSING: 0}
+    for record in records:
+        counts[record["status"]] += 1
+
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "host": host,
+        "passed": counts[FAIL] == 0,
+        "counts": counts,
+        "tests": records,
+    }
+    with open(output_file, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Summary saved to {output_file}")
+
+    if ndjson_file:
+        with open(ndjson_file, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        print(f"NDJSON summary saved to {ndjson_file}")
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluate stress test results against pass/fail thresholds"
+    )
+    parser.add_argument(
+        "results_dir",
+        nargs="?",
+        default="report/results",
+        help="Directory containing test results (default: report/results)",
+    )
+    parser.add_argument(
+        "--config", "-c", help="YAML file with minimum/maximum thresholds per test"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Output JSON file (default: <results_dir>/results_summary.json)",
+    )
+    parser.add_argument("--ndjson", help="Also write one JSON record per test")
+    parser.add_argument(
+        "--require-gpu",
+        action="store_true",
+        help="Treat missing GPU results as failures",
+    )
+
+    args = parser.parse_args()
+
+    thresholds = load_thresholds(args.config)
+    with span("check_results", "script", profile=True):
+        records = evaluate_results(args.results_dir, thresholds, args.require_gpu)
+
+    output_file = args.output or f"{args.results_dir}/results_summary.json"
+    inventory = load_inventory(f"{args.results_dir}/system_info.json")
+    host = inventory.get("fingerprint") if inventory else None
+    summary = write_summary(records, output_file, args.ndjson, host)
+
+    print("\n=== Test Results ===")
+    for record in records:
+        line = f"{record['status'].upper():8} {record['name']}"
+        if record["reasons"]:
+            line += f" ({'; '.join(record['reasons'])})"
+        print(line)
+
+    sys.exit(0 if summary["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
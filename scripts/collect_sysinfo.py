@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+import argparse
+import getpass
+import glob
+import hashlib
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from result_files import open_result
+
+REDACTED = "[REDACTED]"
+
+# Accounts that do not identify anyone, never redacted as user names
+SYSTEM_ACCOUNTS = ["root", "nobody", "daemon", "admin", "user", "runner", "ubuntu"]
+
+# Filesystems that describe real storage, everything else in /proc/mounts is
+# skipped so the inventory is not flooded with proc, cgroup and overlay mounts
+STORAGE_FS = ["ext2", "ext3", "ext4", "xfs", "btrfs", "zfs", "f2fs", "vfat", "ntfs"]
+
+
+def read_text(root, path):
+    """Read a /proc or /sys file below root, returning None if unavailable"""
+    try:
+        with open(os.path.join(root, path.lstrip("/")), "r") as f:
+            return f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def read_int(root, path):
+    value = read_text(root, path)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_cpu_list(text):
+    """Expand a kernel cpu list such as "0-3,8" into [0, 1, 2, 3, 8]"""
+    cpus = []
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def read_cpuinfo(root):
+    """Read the CPU model, microcode and feature flags from /proc/cpuinfo"""
+    content = read_text(root, "/proc/cpuinfo")
+    if not content:
+        return {}
+
+    processors = []
+    current = {}
+    for line in content.split("\n"):
+        if not line.strip():
+            if current:
+                processors.append(current)
+                current = {}
+            continue
+        if ":" in line:
+            key, value = line.split(":", 1)
+            current[key.strip()] = value.strip()
+    if current:
+        processors.append(current)
+
+    first = processors[0] if processors else {}
+    return {
+        "vendor": first.get("vendor_id"),
+        "model": first.get("model name") or first.get("Model"),
+        "family": first.get("cpu family"),
+        "stepping": first.get("stepping"),
+        "microcode": first.get("microcode"),
+        "logical_cpus": len(processors),
+        "flags": sorted((first.get("flags") or first.get("Features") or "").split()),
+    }
+
+
+def read_topology(root):
+    """Count packages, cores and threads from /sys/devices/system/cpu"""
+    online = parse_cpu_list(read_text(root, "/sys/devices/system/cpu/online"))
+    packages = set()
+    cores = set()
+    for cpu in online:
+        topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        package = read_int(root, f"{topology}/physical_package_id")
+        core = read_int(root, f"{topology}/core_id")
+        packages.add(package)
+        cores.add((package, core))
+
+    return {
+        "online_cpus": len(online),
+        "packages": len(packages),
+        "cores": len(cores),
+        "threads_per_core": len(online) // len(cores) if cores else None,
+        "smt": read_text(root, "/sys/devices/system/cpu/smt/control"),
+    }
+
+
+def read_caches(root):
+    """Describe the cache hierarchy seen by cpu0"""
+    caches = []
+    pattern = os.path.join(root, "sys/devices/system/cpu/cpu0/cache/index*")
+    for index_dir in sorted(glob.glob(pattern)):
+        path = "/" + os.path.relpath(index_dir, root)
+        caches.append(
+            {
+                "level": read_int(root, f"{path}/level"),
+                "type": read_text(root, f"{path}/type"),
+                "size": read_text(root, f"{path}/size"),
+                "line_size": read_int(root, f"{path}/coherency_line_size"),
+                "shared_cpus": read_text(root, f"{path}/shared_cpu_list"),
+            }
+        )
+    return caches
+
+
+def read_numa(root):
+    """List NUMA nodes with their CPUs and memory"""
+    nodes = []
+    pattern = os.path.join(root, "sys/devices/system/node/node*")
+    node_dirs = glob.glob(pattern)
+    for node_dir in sorted(node_dirs, key=lambda p: int(p.rsplit("node", 1)[1])):
+        path = "/" + os.path.relpath(node_dir, root)
+        memory_kb = None
+        meminfo = read_text(root, f"{path}/meminfo") or ""
+        match = re.search(r"MemTotal:\s+(\d+) kB", meminfo)
+        if match:
+            memory_kb = int(match.group(1))
+        nodes.append(
+            {
+                "node": int(node_dir.rsplit("node", 1)[1]),
+                "cpus": read_text(root, f"{path}/cpulist"),
+                "memory_kb": memory_kb,
+            }
+        )
+    return nodes
+
+
+def read_meminfo(root):
+    """Read memory totals from /proc/meminfo in kB"""
+    meminfo = {}
+    for line in (read_text(root, "/proc/meminfo") or "").split("\n"):
+        match = re.match(r"(\w+):\s+(\d+)", line)
+        if match:
+            meminfo[match.group(1)] = int(match.group(2))
+
+    return {
+        "total_kb": meminfo.get("MemTotal"),
+        "available_kb": meminfo.get("MemAvailable"),
+        "swap_total_kb": meminfo.get("SwapTotal"),
+        "hugepages_total": meminfo.get("HugePages_Total"),
+        "hugepage_size_kb": meminfo.get("Hugepagesize"),
+    }
+
+
+def read_cpufreq(root):
+    """Read the frequency governor, driver and turbo state"""
+    cpufreq = "/sys/devices/system/cpu/cpu0/cpufreq"
+    turbo = None
+    no_turbo = read_int(root, "/sys/devices/system/cpu/intel_pstate/no_turbo")
+    boost = read_int(root, "/sys/devices/system/cpu/cpufreq/boost")
+    if no_turbo is not None:
+        turbo = no_turbo == 0
+    elif boost is not None:
+        turbo = boost == 1
+
+    return {
+        "governor": read_text(root, f"{cpufreq}/scaling_governor"),
+        "driver": read_text(root, f"{cpufreq}/scaling_driver"),
+        "min_khz": read_int(root, f"{cpufreq}/cpuinfo_min_freq"),
+        "max_khz": read_int(root, f"{cpufreq}/cpuinfo_max_freq"),
+        "turbo": turbo,
+    }
+
+
+def read_mounts(root):
+    """List storage mounts, with usage when inspecting the live system"""
+    mounts = []
+    for line in (read_text(root, "/proc/mounts") or "").split("\n"):
+        fields = line.split()
+        if len(fields) < 4 or fields[2] not in STORAGE_FS:
+            continue
+        mount = {
+            "device": fields[0],
+            "mountpoint": fields[1].replace("\\040", " "),
+            "fstype": fields[2],
+            "options": fields[3],
+        }
+        if root == "/":
+            try:
+                stat = os.statvfs(mount["mountpoint"])
+                mount["size_bytes"] = stat.f_blocks * stat.f_frsize
+                mount["free_bytes"] = stat.f_bavail * stat.f_frsize
+            except OSError:
+                pass
+        mounts.append(mount)
+    return mounts
+
+
+def read_os(root):
+    """Read the distribution and kernel versions"""
+    os_release = {}
+    for line in (read_text(root, "/etc/os-release") or "").split("\n"):
+        if "=" in line:
+            key, value = line.split("=", 1)
+            os_release[key] = value.strip('"')
+
+    return {
+        "name": os_release.get("PRETTY_NAME"),
+        "kernel": read_text(root, "/proc/sys/kernel/osrelease"),
+        "kernel_version": read_text(root, "/proc/sys/kernel/version"),
+        "architecture": platform.machine(),
+    }
+
+
+def parse_nvidia_smi(output):
+    gpus = []
+    for line in output.split("\n"):
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) >= 4:
+            gpus.append(
+                {
+                    "name": fields[0],
+                    "driver": fields[1],
+                    "memory_mib": fields[2],
+                    "compute_capability": fields[3],
+                }
+            )
+    return gpus
+
+
+def parse_dmidecode(output):
+    devices = []
+    current = None
+    for line in output.split("\n"):
+        if line.strip() == "Memory Device":
+            current = {}
+            devices.append(current)
+        elif current is not None and ":" in line:
+            key, value = line.strip().split(":", 1)
+            if key in ["Size", "Type", "Speed", "Configured Memory Speed"]:
+                current[key.lower().replace(" ", "_")] = value.strip()
+    # Empty slots are listed as "No Module Installed"
+    return [
+        device
+        for device in devices
+        if device.get("size", "").lower() not in ["", "no module installed"]
+    ]
+
+
+# Optional tools: inventory key, command and output parser
+OPTIONAL_TOOLS = [
+    (
+        "gpus",
+        [
+            "nvidia-smi",
+            "--query-gpu=name,driver_version,memory.total,compute_cap",
+            "--format=csv,noheader,nounits",
+        ],
+        parse_nvidia_smi,
+    ),
+    ("memory_devices", ["dmidecode", "-t", "memory"], parse_dmidecode),
+]
+
+
+def run_tool(command, parser, timeout):
+    try:
+        result = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return parser(result.stdout)
+
+
+def run_optional_tools(timeout=10, tools=None):
+    """
+    Run the optional inventory tools in parallel
+
+    Tools that are missing, fail or exceed the timeout are reported as None.
+    """
+    tools = OPTIONAL_TOOLS if tools is None else tools
+    if not tools:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+        futures = {
+            key: executor.submit(run_tool, command, parser, timeout)
+            for key, command, parser in tools
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def identities():
+    """Names that identify the machine or the user running the tests"""
+    names = set()
+    for name in [
+        socket.gethostname(),
+        os.environ.get("USER"),
+        os.environ.get("SUDO_USER"),
+        os.environ.get("LOGNAME"),
+    ]:
+        if name:
+            names.add(name)
+    try:
+        names.add(getpass.getuser())
+    except Exception:
+        pass
+    # System accounts and very short names would redact unrelated words,
+    # e.g. "root" in /dev/mapper/vg-root when the tests run under sudo
+    names = {
+        name for name in names if len(name) > 3 and name not in SYSTEM_ACCOUNTS
+    }
+    return sorted(names, key=len, reverse=True)
+
+
+def redact_text(text, names=None):
+    """
+    Remove hostnames, user names and home directories from text
+
+    This is the single redaction step for everything that ends up in the
+    report, both the structured inventory and raw tool output.
+    """
+    names = identities() if names is None else names
+    text = re.sub(r"(?im)^(\s*(hostname|run-by)\s*:).*$", rf"\1 {REDACTED}", text)
+    text = re.sub(r"/home/[^/\s]+", "/home/[USER]", text)
+    text = re.sub(r"\b([\w.-]+)@[\w.-]+\b", rf"\1@{REDACTED}", text)
+    for name in names:
+        text = re.sub(rf"\b{re.escape(name)}\b", REDACTED, text)
+    return text
+
+
+def redact(value, names=None):
+    """Apply redact_text to every string in a nested inventory"""
+    names = identities() if names is None else names
+    if isinstance(value, str):
+        return redact_text(value, names)
+    if isinstance(value, list):
+        return [redact(item, names) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item, names) for key, item in value.items()}
+    return value
+
+
+def fingerprint(fields):
+    encoded = json.dumps(fields, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def host_fingerprint(inventory):
+    """
+    Fingerprint the host for result comparison
+
+    The hardware fingerprint only changes when the machine changes, the
+    software fingerprint also changes with kernel, microcode or governor
+    updates.
+    """
+    cpu = inventory.get("cpu", {})
+    topology = inventory.get("topology", {})
+    memory_kb = inventory.get("memory", {}).get("total_kb") or 0
+    hardware = {
+        "cpu_model": cpu.get("model"),
+        "packages": topology.get("packages"),
+        "cores": topology.get("cores"),
+        "logical_cpus": topology.get("online_cpus"),
+        # Round to GiB, firmware reservations vary slightly between boots
+        "memory_gib": round(memory_kb / 1048576),
+        "gpus": [gpu["name"] for gpu in inventory.get("gpus") or []],
+    }
+    software = dict(hardware)
+    software.update(
+        {
+            "kernel": inventory.get("os", {}).get("kernel"),
+            "microcode": cpu.get("microcode"),
+            "governor": inventory.get("cpufreq", {}).get("governor"),
+            "turbo": inventory.get("cpufreq", {}).get("turbo"),
+        }
+    )
+    return {"hardware": fingerprint(hardware), "software": fingerprint(software)}
+
+
+def collect_inventory(root="/", timeout=10, tools=None):
+    """
+    Collect a redacted system inventory
+
+    Args:
+        root (str): Filesystem root containing proc/ and sys/
+        timeout (float): Timeout in seconds for each optional tool
+        tools (list): Optional tools to run, defaults to OPTIONAL_TOOLS
+
+    Returns:
+        dict: Structured system inventory
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Optional tools run while /proc and /sys are read
+        tool_results = executor.submit(run_optional_tools, timeout, tools)
+
+        inventory = {
+            "timestamp": datetime.now().isoformat(),
+            "cpu": read_cpuinfo(root),
+            "topology": read_topology(root),
+            "caches": read_caches(root),
+            "numa": read_numa(root),
+            "memory": read_meminfo(root),
+            "cpufreq": read_cpufreq(root),
+            "mounts": read_mounts(root),
+            "os": read_os(root),
+        }
+        inventory.update(tool_results.result())
+
+    inventory = redact(inventory)
+    inventory["fingerprint"] = host_fingerprint(inventory)
+    return inventory
+
+
+def _size(kb):
+    return f"{kb / 1048576:.1f} GiB" if kb is not None else "unknown"
+
+
+def format_inventory(inventory):
+    """Render the inventory as the plain text system summary"""
+    cpu = inventory.get("cpu", {})
+    topology = inventory.get("topology", {})
+    memory = inventory.get("memory", {})
+    cpufreq = inventory.get("cpufreq", {})
+    os_info = inventory.get("os", {})
+
+    lines = ["=== System Information ===", inventory.get("timestamp", ""), ""]
+    lines.append("CPU Info:")
+    lines.append(f"  Model: {cpu.get('model')}")
+    lines.append(f"  Vendor: {cpu.get('vendor')}")
+    lines.append(f"  Microcode: {cpu.get('microcode')}")
+    lines.append(
+        f"  Topology: {topology.get('packages')} package(s), "
+        f"{topology.get('cores')} cores, {topology.get('online_cpus')} threads"
+    )
+    lines.append(
+        f"  Governor: {cpufreq.get('governor')} ({cpufreq.get('driver')}), "
+        f"turbo: {cpufreq.get('turbo')}"
+    )
+    for cache in inventory.get("caches", []):
+        lines.append(
+            f"  L{cache['level']} {cache['type']} cache: {cache['size']} "
+            f"(shared by CPUs {cache['shared_cpus']})"
+        )
+    lines.append("")
+
+    lines.append("Memory Info:")
+    lines.append(f"  Total: {_size(memory.get('total_kb'))}")
+    lines.append(f"  Available: {_size(memory.get('available_kb'))}")
+    lines.append(f"  Swap: {_size(memory.get('swap_total_kb'))}")
+    for node in inventory.get("numa", []):
+        lines.append(
+            f"  NUMA node {node['node']}: CPUs {node['cpus']}, "
+            f"{_size(node['memory_kb'])}"
+        )
+    for device in inventory.get("memory_devices") or []:
+        lines.append(
+            f"  DIMM: {device.get('size')} {device.get('type')} "
+            f"{device.get('configured_memory_speed') or device.get('speed')}"
+        )
+    lines.append("")
+
+    lines.append("GPU Info:")
+    if inventory.get("gpus"):
+        for gpu in inventory["gpus"]:
+            lines.append(
+                f"  {gpu['name']}: driver {gpu['driver']}, {gpu['memory_mib']} MiB, "
+                f"compute capability {gpu['compute_capability']}"
+            )
+    else:
+        lines.append("  No NVIDIA GPU detected")
+    lines.append("")
+
+    lines.append("Disk Usage:")
+    for mount in inventory.get("mounts", []):
+        usage = ""
+        if mount.get("size_bytes"):
+            used = mount["size_bytes"] - mount["free_bytes"]
+            usage = f" {used / 1e9:.1f}/{mount['size_bytes'] / 1e9:.1f} GB used"
+        lines.append(
+            f"  {mount['device']} on {mount['mountpoint']} ({mount['fstype']}){usage}"
+        )
+    lines.append("")
+
+    lines.append("OS Info:")
+    lines.append(f"  {os_info.get('name')}")
+    lines.append(f"  Kernel: {os_info.get('kernel')} {os_info.get('kernel_version')}")
+    lines.append(f"  Architecture: {os_info.get('architecture')}")
+    lines.append("")
+
+    fingerprints = inventory.get("fingerprint", {})
+    lines.append(
+        f"Host Fingerprint: hardware {fingerprints.get('hardware')}, "
+        f"software {fingerprints.get('software')}"
+    )
+    return "\n".join(lines) + "\n"
+
+
+def load_inventory(file_path):
+    """Load a saved inventory, returning None if it is unavailable"""
+    try:
+        with open_result(file_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Collect a redacted system inventory from /proc and /sys"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="report/results/system_info.json",
+        help="Output JSON file (default: report/results/system_info.json)",
+    )
+    parser.add_argument("--text", help="Also write a plain text summary")
+    parser.add_argument(
+        "--root", default="/", help="Filesystem root containing proc/ and sys/"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10,
+        help="Timeout in seconds for each optional tool (default: 10)",
+    )
+    parser.add_argument(
+        "--no-tools", action="store_true", help="Skip nvidia-smi and dmidecode"
+    )
+
+    args = parser.parse_args()
+
+    tools = [] if args.no_tools else None
+    inventory = collect_inventory(args.root, args.timeout, tools)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(inventory, f, indent=2)
+    print(f"System inventory saved to {args.output}")
+
+    if args.text:
+        with open(args.text, "w") as f:
+            f.write(format_inventory(inventory))
+        print(f"System summary saved to {args.text}")
+
+    if not inventory["cpu"]:
+        print("Warning: /proc/cpuinfo could not be read", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+from datetime import datetime
+
+from check_results import evaluate_results
+from collect_sysinfo import load_inventory
+
+# Normalized throughput per test: metric key and unit, higher is better
+THROUGHPUT = {
+    "gpu_burn": ("avg_gflops", "Gflop/s"),
+    "glmark2": ("score", "score"),
+}
+DEFAULT_THROUGHPUT = ("bogo_ops_per_second", "bogo-ops/s")
+
+# Chart groups for the side-by-side comparison
+CHART_GROUPS = [
+    ("cpu", "CPU", ["cpu_single", "cpu_multi", "cpu_all"]),
+    ("memory", "Memory", ["mem_single", "mem_multi"]),
+    ("disk", "Disk IO", ["disk_write_test", "disk_io_test", "disk_fallocate_test"]),
+    ("gpu", "GPU", ["gpu_burn", "glmark2"]),
+]
+
+# Inventory fields that explain performance changes
+INVENTORY_FIELDS = [
+    ("CPU model", ("cpu", "model")),
+    ("Microcode", ("cpu", "microcode")),
+    ("Kernel", ("os", "kernel")),
+    ("Kernel build", ("os", "kernel_version")),
+    ("OS", ("os", "name")),
+    ("Governor", ("cpufreq", "governor")),
+    ("Frequency driver", ("cpufreq", "driver")),
+    ("Turbo", ("cpufreq", "turbo")),
+    ("Max frequency (kHz)", ("cpufreq", "max_khz")),
+    ("SMT", ("topology", "smt")),
+    ("Logical CPUs", ("topology", "online_cpus")),
+    ("Memory total (kB)", ("memory", "total_kb")),
+    ("Huge pages", ("memory", "hugepages_total")),
+    ("NUMA nodes", ("numa",)),
+    ("Memory speed", ("memory_devices",)),
+    ("GPUs", ("gpus",)),
+]
+
+# Two-sided 95% critical values of Student's t by degrees of freedom
+T_CRITICAL_95 = {
+    1: 12.706,
+    2: 4.303,
+    3: 3.182,
+    4: 2.776,
+    5: 2.571,
+    6: 2.447,
+    7: 2.365,
+    8: 2.306,
+    9: 2.262,
+    10: 2.228,
+    12: 2.179,
+    15: 2.131,
+    20: 2.086,
+    30: 2.042,
+    40: 2.021,
+    60: 2.000,
+    120: 1.980,
+    1000: 1.962,
+}
+
+
+def resolve_run(run, runs_dir="runs"):
+    """
+    Resolve a results directory, report directory, bundle or run ID
+
+    Run IDs refer to bundles written by `just archive_results <name>`.
+    """
+    candidates = [run, f"{runs_dir}/{run}.zip", f"{runs_dir}/{run}"]
+    for candidate in candidates:
+        if os.path.isdir(os.path.join(candidate, "results")):
+            return os.path.join(candidate, "results")
+        if os.path.isdir(candidate) or os.path.isfile(candidate):
+            return candidate
+    print(f"Error: Run '{run}' not found", file=sys.stderr)
+    sys.exit(1)
+
+
+def throughput(record):
+    key, _ = THROUGHPUT.get(record["test"], DEFAULT_THROUGHPUT)
+    value = record["metrics"].get(key)
+    return value if isinstance(value, (int, float)) else None
+
+
+def collect_trials(results_dirs):
+    """
+    Collect throughput per test over one or more repeated runs
+
+    Returns:
+        dict: Test id to (display name, list of throughput values)
+    """
+    trials = {}
+    for results_dir in results_dirs:
+        for record in evaluate_results(results_dir):
+            _, values = trials.setdefault(record["test"], (record["name"], []))
+            value = throughput(record)
+            if value is not None:
+                values.append(value)
+    return trials
+
+
+def t_critical(df):
+    """
+    Critical value for the largest tabulated df not above df
+
+    Welch's df is fractional, rounding it down keeps the test conservative.
+    """
+    tabulated = [limit for limit in T_CRITICAL_95 if limit <= df]
+    return T_CRITICAL_95[max(tabulated) if tabulated else 1]
+
+
+def significance(before, after):
+    """
+    Welch's t-test at the 95% level
+
+    Returns:
+        str: "yes" or "no", or None without at least two trials per side
+    """
+    if len(before) < 2 or len(after) < 2:
+        return None
+    var_before = statistics.variance(before) / len(before)
+    var_after = statistics.variance(after) / len(after)
+    stderr = math.sqrt(var_before + var_after)
+    delta = statistics.mean(after) - statistics.mean(before)
+    if stderr == 0:
+        return "yes" if delta else "no"
+
+    # Welch-Satterthwaite degrees of freedom
+    df = (var_before + var_after) ** 2 / (
+        var_before**2 / (len(before) - 1) + var_after**2 / (len(after) - 1)
+    )
+    return "yes" if abs(delta / stderr) > t_critical(df) else "no"
+
+
+def compare_tests(before_trials, after_trials):
+    """Per-test deltas in normalized throughput"""
+    rows = []
+    for test, (name, before) in before_trials.items():
+        after = after_trials.get(test, (name, []))[1]
+        if not before and not after:
+            continue
+        unit = THROUGHPUT.get(test, DEFAULT_THROUGHPUT)[1]
+        row = {
+            "test": test,
+            "name": name,
+            "unit": unit,
+            "before": statistics.mean(before) if before else None,
+            "after": statistics.mean(after) if after else None,
+            "before_trials": len(before),
+            "after_trials": len(after),
+            "before_stdev": statistics.stdev(before) if len(before) > 1 else None,
+            "after_stdev": statistics.stdev(after) if len(after) > 1 else None,
+            "delta_pct": None,
+            "significant": significance(before, after),
+        }
+        if row["before"] and row["after"] is not None:
+            row["delta_pct"] = 100 * (row["after"] - row["before"]) / row["before"]
+        rows.append(row)
+    return rows
+
+
+def _field(inventory, path):
+    value = inventory
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+
+    if path == ("numa",):
+        return len(value) if value else None
+    if path == ("memory_devices",):
+        speeds = sorted(
+            {d.get("configured_memory_speed") or d.get("speed") for d in value or []}
+            - {None}
+        )
+        return ", ".join(speeds) or None
+    if path == ("gpus",):
+        return ", ".join(gpu["name"] for gpu in value or []) or None
+    return value
+
+
+def compare_inventories(before, after):
+    """
+    List the configuration fields that differ between two inventories
+
+    Returns:
+        list: (field, before value, after value) for every difference
+    """
+    if not before or not after:
+        return []
+    changes = []
+    for label, path in INVENTORY_FIELDS:
+        old, new = _field(before, path), _field(after, path)
+        if old != new:
+            changes.append((label, old, new))
+    return changes
+
+
+def _format_value(value, stdev=None):
+    if value is None:
+        return "n/a"
+    text = f"{value:,.2f}"
+    if stdev is not None:
+        text += f" ± {stdev:,.2f}"
+    return text
+
+
+def format_diff_md(rows, changes, before_label, after_label, charts):
+    """Create the diff report in markdown format"""
+    diff_md = "# Run Comparison\n"
+    diff_md += f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    diff_md += f"- Before: `{before_label}`\n"
+    diff_md += f"- After: `{after_label}`\n"
+
+    diff_md += "\n## Performance Changes\n"
+    diff_md += "| Test | Unit | Before | After | Change | Significant |\n"
+    diff_md += "|------|------|--------|-------|--------|-------------|\n"
+    for row in rows:
+        change = "n/a"
+        if row["delta_pct"] is not None:
+            change = f"{row['delta_pct']:+.1f}%"
+        significant = row["significant"] or "n/a"
+        if row["significant"] is None and row["before"] and row["after"]:
+            significant = "n/a (single trial)"
+        diff_md += (
+            f"| {row['name']} | {row['unit']} "
+            f"| {_format_value(row['before'], row['before_stdev'])} "
+            f"| {_format_value(row['after'], row['after_stdev'])} "
+            f"| {change} | {significant} |\n"
+        )
+    diff_md += (
+        "\nSignificance uses Welch's t-test at the 95% level and needs at least "
+        "two trials on each side.\n"
+    )
+
+    diff_md += "\n## Configuration Changes\n"
+    if changes:
+        diff_md += "| Setting | Before | After |\n"
+        diff_md += "|---------|--------|-------|\n"
+        for label, old, new in changes:
+            diff_md += f"| {label} | {old} | {new} |\n"
+    else:
+        diff_md += "No differences found in the system inventory.\n"
+
+    if charts:
+        diff_md += "\n## Charts\n"
+        for title, chart in charts:
+            diff_md += f"\n### {title}\n![{title}]({chart})\n"
+
+    return diff_md
+
+
+def plot_diff(rows, output_dir):
+    """Plot before/after throughput side by side for each test group"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    by_test = {row["test"]: row for row in rows}
+    charts = []
+    for key, title, tests in CHART_GROUPS:
+        group = [by_test[test] for test in tests if test in by_test]
+        group = [row for row in group if row["before"] or row["after"]]
+        if not group:
+            continue
+
+        fig, axes = plt.subplots(1, len(group), figsize=(5 * len(group), 5))
+        if len(group) == 1:
+            axes = [axes]
+        for ax, row in zip(axes, group):
+            values = [row["before"] or 0, row["after"] or 0]
+            errors = [row["before_stdev"] or 0, row["after_stdev"] or 0]
+            bars = ax.bar(
+                ["Before", "After"], values, yerr=errors, color=["tab:gray", "tab:blue"]
+            )
+            ax.bar_label(bars, fmt="%.1f")
+            ax.set_title(row["name"])
+            ax.set_ylabel(row["unit"])
+        fig.suptitle(f"{title} Before/After")
+        fig.tight_layout()
+        chart = f"diff_{key}.png"
+        plt.savefig(os.path.join(output_dir, chart))
+        plt.close()
+        charts.append((f"{title} Performance", chart))
+    return charts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two stress test runs and report what moved"
+    )
+    parser.add_argument(
+        "runs",
+        nargs="*",
+        help="Before and after run: results/report directory, .zip bundle or run ID",
+    )
+    parser.add_argument(
+        "--before", "-b", nargs="+", help="One or more repeated trials before"
+    )
+    parser.add_argument(
+        "--after", "-a", nargs="+", help="One or more repeated trials after"
+    )
+    parser.add_argument(
+        "--runs-dir", default="runs", help="Directory of archived runs (default: runs)"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="report/diff",
+        help="Output directory for the diff report (default: report/diff)",
+    )
+    parser.add_argument("--no-charts", action="store_true", help="Skip the charts")
+
+    args = parser.parse_args()
+
+    if args.runs and (args.before or args.after):
+        parser.error("give either two runs or --before/--after, not both")
+    if args.runs:
+        if len(args.runs) != 2:
+            parser.error("expected exactly two runs to compare")
+        before_runs, after_runs = [args.runs[0]], [args.runs[1]]
+    elif args.before and args.after:
+        before_runs, after_runs = args.before, args.after
+    else:
+        parser.error("expected two runs or --before and --after")
+
+    before_dirs = [resolve_run(run, args.runs_dir) for run in before_runs]
+    after_dirs = [resolve_run(run, args.runs_dir) for run in after_runs]
+
+    rows = compare_tests(collect_trials(before_dirs), collect_trials(after_dirs))
+    changes = compare_inventories(
+        load_inventory(f"{before_dirs[0]}/system_info.json"),
+        load_inventory(f"{after_dirs[-1]}/system_info.json"),
+    )
+
+    os.makedirs(args.output, exist_ok=True)
+    charts = [] if args.no_charts else plot_diff(rows, args.output)
+
+    diff_md = format_diff_md(
+        rows, changes, ", ".join(before_runs), ", ".join(after_runs), charts
+    )
+    with open(os.path.join(args.output, "diff.md"), "w") as f:
+        f.write(diff_md)
+    with open(os.path.join(args.output, "diff.json"), "w") as f:
+        json.dump(
+            {
+                "before": before_runs,
+                "after": after_runs,
+                "tests": rows,
+                "configuration_changes": [
+                    {"setting": label, "before": old, "after": new}
+                    for label, old, new in changes
+                ],
+            },
+            f,
+            indent=2,
+        )
+    print(f"Diff report generated in {args.output}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from result_files import open_result
+
+DEFAULT_SYSFS_ROOT = "/sys"
+
+
+def read_int(path):
+    try:
+        with open(path, "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def find_domains(sysfs_root=DEFAULT_SYSFS_ROOT):
+    """
+    Find readable RAPL energy counters under /sys/class/powercap
+
+    Args:
+        sysfs_root (str): Root of the sysfs tree, configurable for fixtures
+
+    Returns:
+        list: Dicts with the domain name, counter path and wraparound range
+    """
+    domains = []
+    pattern = os.path.join(sysfs_root, "class/powercap/intel-rapl:*")
+    for zone_dir in sorted(glob.glob(pattern)):
+        try:
+            with open(os.path.join(zone_dir, "name"), "r") as f:
+                name = f.read().strip()
+        except OSError:
+            continue
+
+        energy_file = os.path.join(zone_dir, "energy_uj")
+        # Counters are root-only on most kernels, skip the ones we cannot read
+        if read_int(energy_file) is None:
+            continue
+
+        zone = os.path.basename(zone_dir)
+        if name.startswith("package") or name.startswith("psys"):
+            label = name
+        else:
+            # Subzones such as dram or core are named per package
+            package = zone.split(":")[1]
+            label = f"{name}-{package}"
+
+        max_energy_file = os.path.join(zone_dir, "max_energy_range_uj")
+        domains.append(
+            {
+                "name": label,
+                "zone": zone,
+                "energy_file": energy_file,
+                "max_energy_uj": read_int(max_energy_file),
+            }
+        )
+    return domains
+
+
+def counter_delta(previous, current, max_energy_uj):
+    """Energy consumed between two counter readings, handling wraparound"""
+    if current >= previous:
+        return current - previous
+    if not max_energy_uj:
+        return 0
+    return current + max_energy_uj + 1 - previous
+
+
+class EnergyMeter:
+    """
+    Accumulate RAPL energy while a workload runs
+
+    The counters are sampled in a background thread so that a counter
+    wrapping more than once during a long test is still accounted for.
+    """
+
+    def __init__(self, sysfs_root=DEFAULT_SYSFS_ROOT, interval=1.0):
+        self.domains = find_domains(sysfs_root)
+        self.interval = interval
+        self.last = {}
+        self.energy_uj = {domain["name"]: 0 for domain in self.domains}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started = None
+        self.elapsed = None
+
+    def sample(self):
+        with self.lock:
+            for domain in self.domains:
+                value = read_int(domain["energy_file"])
+                if value is None:
+                    continue
+                previous = self.last.get(domain["name"])
+                if previous is not None:
+                    self.energy_uj[domain["name"]] += counter_delta(
+                        previous, value, domain["max_energy_uj"]
+                    )
+                self.last[domain["name"]] = value
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.sample()
+        if self.domains:
+            self.thread = threading.Thread(target=self._run)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.sample()
+        self.elapsed = time.perf_counter() - self.started
+
+    def results(self):
+        """
+        Summarize the measured energy
+
+        Returns:
+            dict: Energy per domain in joules, package and DRAM totals and
+                average power, or available=False without readable counters
+        """
+        if not self.domains:
+            return {"available": False, "duration_s": self.elapsed}
+
+        joules = {name: uj / 1000000 for name, uj in self.energy_uj.items()}
+        package = sum(j for name, j in joules.items() if name.startswith("package"))
+        dram = sum(j for name, j in joules.items() if name.startswith("dram"))
+        has_dram = any(name.startswith("dram") for name in joules)
+        duration = self.elapsed or 0
+        return {
+            "available": True,
+            "duration_s": duration,
+            "domains": joules,
+            "package_joules": package,
+            "dram_joules": dram if has_dram else None,
+            "total_joules": package + dram,
+            "avg_power_w": (package + dram) / duration if duration else None,
+        }
+
+
+def load_energy(file_path):
+    """Load a saved energy measurement, returning None if unavailable"""
+    try:
+        with open_result(file_path) as f:
+            energy = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return energy if energy.get("available") else None
+
+
+def bogo_ops_per_joule(bogo_ops, energy):
+    """Bogo operations per joule of package and DRAM energy"""
+    if not energy or not bogo_ops or not energy.get("total_joules"):
+        return None
+    return bogo_ops / energy["total_joules"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure RAPL package and DRAM energy while a command runs"
+    )
+    parser.add_argument("output", help="Output JSON file for the energy results")
+    parser.add_argument(
+        "--sysfs-root",
+        default=DEFAULT_SYSFS_ROOT,
+        help=f"Root of the sysfs tree (default: {DEFAULT_SYSFS_ROOT})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between counter samples (default: 1)",
+    )
+    parser.usage = "%(prog)s [options] output -- command ..."
+
+    # Everything after "--" is the measured command
+    argv = sys.argv[1:]
+    split = argv.index("--") if "--" in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    command = argv[split + 1 :]
+    if not command:
+        print("Error: No command given", file=sys.stderr)
+        sys.exit(2)
+
+    meter = EnergyMeter(args.sysfs_root, args.interval)
+    if not meter.domains:
+        print(
+            "Warning: No readable RAPL energy counters, energy will not be measured",
+            file=sys.stderr,
+        )
+
+    meter.start()
+    try:
+        returncode = subprocess.call(command)
+    finally:
+        meter.stop()
+
+    energy = meter.results()
+    with open(args.output, "w") as f:
+        json.dump(energy, f, indent=2)
+    if energy["available"]:
+        print(
+            f"Energy: {energy['total_joules']:.1f} J, "
+            f"average power {energy['avg_power_w']:.1f} W"
+        )
+
+    sys.exit(returncode)
+
+
+if __name__ == "__main__":
+    main()
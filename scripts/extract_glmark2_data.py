@@ -2,24 +2,67 @@
 import argparse
 import json
 import re
+import statistics
 import sys
 from datetime import datetime
 
+from pipeline_trace import span
+from result_files import open_result
+
+
+# OpenGL information lines and the key they are stored under
+GL_INFO_KEYS = {
+    "GL_VENDOR:": "vendor",
+    "GL_RENDERER:": "renderer",
+    "GL_VERSION:": "version",
+    "Surface Config:": "surface_config",
+    "Surface Size:": "surface_size",
+}
+
+# "[scene] option=value:option=value: FPS: 123 FrameTime: 8.130 ms", options may
+# contain colons themselves and are "<default>" for scenes run without options
+RESULT_PATTERN = re.compile(
+    r"\[(?P<scene>[^\]]+)\]\s*(?P<options>.*?):\s*FPS:\s*(?P<fps>\d+)"
+    r"\s+FrameTime:\s*(?P<frame_time>[\d.]+)\s*ms"
+)
+SCORE_PATTERN = re.compile(r"glmark2 Score:\s+(\d+)")
+
+
+def scene_label(scene, options):
+    """Unique label for a scene and option set, e.g. build use-vbo=false"""
+    if not options or options == "<default>":
+        return scene
+    return f"{scene} {options}"
+
+
+def _stats(values):
+    mean = sum(values) / len(values)
+    stddev = statistics.stdev(values) if len(values) > 1 else None
+    return mean, stddev
+
 
 def parse_glmark2_output(log_file):
     """
     Parse glmark2 output to extract performance data
 
+    The log is read line by line in a single pass. Results are grouped by
+    scene and option set, and logs holding several glmark2 runs (one score
+    line per run) get the mean and standard deviation per scene.
+
     Args:
         log_file (str): Path to the glmark2 output log file
 
     Returns:
-        dict: Parsed data including OpenGL info, test results, and overall score
+        dict: Parsed data including OpenGL info, test results, per-scene
+            statistics, and overall score
     """
     data = {
         "timestamp": datetime.now().isoformat(),
         "opengl_info": {},
         "test_results": [],
+        "scenes": [],
+        "runs": 0,
+        "scores": [],
         "overall_score": None,
         "summary": {
             "total_tests": 0,
@@ -29,59 +72,73 @@ def parse_glmark2_output(log_file):
         },
     }
 
+    # Per scene/option set results, in the order glmark2 first ran them
+    groups = {}
+    run = 0
     try:
-        with open(log_file, "r") as f:
-            content = f.read()
+        with open_result(log_file) as f:
+            for line in f:
+                if "FPS:" in line:
+                    match = RESULT_PATTERN.search(line)
+                    if match:
+                        scene = match.group("scene")
+                        options = match.group("options").strip()
+                        result = {
+                            "test_name": scene_label(scene, options),
+                            "scene": scene,
+                            "options": options,
+                            "run": run,
+                            "fps": int(match.group("fps")),
+                            "frame_time_ms": float(match.group("frame_time")),
+                        }
+                        data["test_results"].append(result)
+                        groups.setdefault((scene, options), []).append(result)
+                        continue
+
+                if "glmark2 Score:" in line:
+                    match = SCORE_PATTERN.search(line)
+                    if match:
+                        # The score line closes a run, later results are a repeat
+                        data["scores"].append(int(match.group(1)))
+                        run += 1
+                    continue
+
+                for prefix, key in GL_INFO_KEYS.items():
+                    if prefix in line:
+                        data["opengl_info"][key] = line.split(prefix, 1)[1].strip()
+                        break
     except Exception as e:
         print(f"Error reading file: {e}", file=sys.stderr)
         return data
 
-    # Extract OpenGL information with flexible whitespace handling
-    lines = content.split("\n")
-    for i, line in enumerate(lines):
-        if "GL_VENDOR:" in line:
-            parts = line.split("GL_VENDOR:", 1)
-            if len(parts) > 1:
-                data["opengl_info"]["vendor"] = parts[1].strip()
-        elif "GL_RENDERER:" in line:
-            parts = line.split("GL_RENDERER:", 1)
-            if len(parts) > 1:
-                data["opengl_info"]["renderer"] = parts[1].strip()
-        elif "GL_VERSION:" in line:
-            parts = line.split("GL_VERSION:", 1)
-            if len(parts) > 1:
-                data["opengl_info"]["version"] = parts[1].strip()
-        elif "Surface Config:" in line:
-            parts = line.split("Surface Config:", 1)
-            if len(parts) > 1:
-                data["opengl_info"]["surface_config"] = parts[1].strip()
-        elif "Surface Size:" in line:
-            parts = line.split("Surface Size:", 1)
-            if len(parts) > 1:
-                data["opengl_info"]["surface_size"] = parts[1].strip()
-
-    # Extract test results - using pattern that handles variable spacing
-    test_pattern = r"\[(.+?)\][^:]*:\s*FPS:\s+(\d+)\s+FrameTime:\s+([\d.]+)\s+ms"
-    test_matches = re.findall(test_pattern, content)
-
-    fps_values = []
-    for match in test_matches:
-        test_name = match[0]
-        fps = int(match[1])
-        frame_time = float(match[2])
-
-        data["test_results"].append(
-            {"test_name": test_name, "fps": fps, "frame_time_ms": frame_time}
+    # A trailing run without a score line, e.g. an interrupted one, still counts
+    data["runs"] = run
+    if data["test_results"] and data["test_results"][-1]["run"] == run:
+        data["runs"] += 1
+
+    for (scene, options), results in groups.items():
+        fps_mean, fps_stddev = _stats([r["fps"] for r in results])
+        frame_mean, frame_stddev = _stats([r["frame_time_ms"] for r in results])
+        data["scenes"].append(
+            {
+                "test_name": scene_label(scene, options),
+                "scene": scene,
+                "options": options,
+                "runs": len(results),
+                "fps_mean": fps_mean,
+                "fps_stddev": fps_stddev,
+                "frame_time_ms_mean": frame_mean,
+                "frame_time_ms_stddev": frame_stddev,
+            }
         )
-        fps_values.append(fps)
 
-    # Extract overall score
-    score_pattern = r"glmark2 Score:\s+(\d+)"
-    score_match = re.search(score_pattern, content)
-    if score_match:
-        data["overall_score"] = int(score_match.group(1))
+    if data["scores"]:
+        data["overall_score"] = round(sum(data["scores"]) / len(data["scores"]))
+        if len(data["scores"]) > 1:
+            data["score_stddev"] = statistics.stdev(data["scores"])
 
-    # Calculate summary statistics
+    # Calculate summary statistics over the per-scene means
+    fps_values = [scene["fps_mean"] for scene in data["scenes"]]
     if fps_values:
         data["summary"]["total_tests"] = len(fps_values)
         data["summary"]["min_fps"] = min(fps_values)
@@ -95,23 +152,27 @@ def extract_plot_data(glmark2_data):
     """
     Extract data suitable for plotting
 
+    Names are kept in full so distinct option sets of the same scene stay
+    separate bars.
+
     Args:
         glmark2_data (dict): Parsed glmark2 data
 
     Returns:
         dict: Data formatted for plotting
     """
-    plot_data = {"test_names": [], "fps_values": [], "frame_times": []}
-
-    for result in glmark2_data["test_results"]:
-        # Truncate long test names for better plotting
-        test_name = result["test_name"]
-        if len(test_name) > 20:
-            test_name = test_name[:17] + "..."
+    plot_data = {
+        "test_names": [],
+        "fps_values": [],
+        "fps_stddev": [],
+        "frame_times": [],
+    }
 
-        plot_data["test_names"].append(test_name)
-        plot_data["fps_values"].append(result["fps"])
-        plot_data["frame_times"].append(result["frame_time_ms"])
+    for scene in glmark2_data["scenes"]:
+        plot_data["test_names"].append(scene["test_name"])
+        plot_data["fps_values"].append(round(scene["fps_mean"], 1))
+        plot_data["fps_stddev"].append(scene["fps_stddev"])
+        plot_data["frame_times"].append(scene["frame_time_ms_mean"])
 
     return plot_data
 
@@ -150,7 +211,8 @@ def main():
     args = parser.parse_args()
 
     # Parse the glmark2 output
-    glmark2_data = parse_glmark2_output(args.log_file)
+    with span("parse:glmark2.log", "parse", profile=True):
+        glmark2_data = parse_glmark2_output(args.log_file)
 
     # Save the main data
     save_data(glmark2_data, args.output)
@@ -172,11 +234,13 @@ def main():
         print(f"OpenGL Version: {glmark2_data['opengl_info']['version']}")
     if glmark2_data["overall_score"]:
         print(f"Overall Score: {glmark2_data['overall_score']}")
+    if glmark2_data["runs"] > 1:
+        print(f"Runs: {glmark2_data['runs']}")
     if glmark2_data["summary"]["total_tests"] > 0:
         print(f"Tests Completed: {glmark2_data['summary']['total_tests']}")
         print(f"Average FPS: {glmark2_data['summary']['avg_fps']:.2f}")
-        print(f"Min FPS: {glmark2_data['summary']['min_fps']}")
-        print(f"Max FPS: {glmark2_data['summary']['max_fps']}")
+        print(f"Min FPS: {glmark2_data['summary']['min_fps']:.1f}")
+        print(f"Max FPS: {glmark2_data['summary']['max_fps']:.1f}")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
-import os
 import re
 import sys
 
+from pipeline_trace import span
+from result_files import open_result, result_exists
+
 
 def extract_gpu_data(log_file):
     """
     Extract GPU performance data from gpu_burn log for plotting
     """
-    if not os.path.exists(log_file):
+    if not result_exists(log_file):
         print(f"Error: Log file '{log_file}' not found", file=sys.stderr)
         return None, None
 
     data = []
-    with open(log_file, "r") as f:
+    with open_result(log_file) as f:
         for line in f:
             if "proc'd:" in line:
                 # Extract percentage, Gflops, and temperature
@@ -28,7 +30,7 @@ def extract_gpu_data(log_file):
 
     # Check test result
     result = "UNKNOWN"
-    with open(log_file, "r") as f:
+    with open_result(log_file) as f:
         content = f.read()
         if "OK" in content:
             result = "PASS"
@@ -55,7 +57,8 @@ if __name__ == "__main__":
         sys.exit(1)
 
     log_file = sys.argv[1]
-    data, result = extract_gpu_data(log_file)
+    with span("parse:gpu_burn.log", "parse", profile=True):
+        data, result = extract_gpu_data(log_file)
 
     if data is None:
         sys.exit(1)
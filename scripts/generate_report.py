@@ -2,129 +2,28 @@
 import os
 import sys
 from datetime import datetime
+from functools import partial
 
+from check_results import PASS, evaluate_results, load_thresholds
+from collect_sysinfo import format_inventory, load_inventory, redact_text
+from pipeline_trace import span
+from preflight import load_preflight
+from result_files import open_result, result_exists
 
-def create_summary_md(results_dir, src_dir):
+
+def create_summary_md(results_dir, src_dir, thresholds=None):
     """Create the test summary chapter in markdown format"""
     summary_md = "# Test Summary\n"
     summary_md += "| Test Name | Result | Details |\n"
     summary_md += "|-----------|--------|---------|\n"
 
-    # Check CPU Single Core test
-    if os.path.exists(f"{results_dir}/cpu_single.yaml"):
-        with open(f"{results_dir}/cpu_single.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| CPU Single Core | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| CPU Single Core | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| CPU Single Core | ❌ | No test results found |\n"
-
-    # Check CPU Multi Core test
-    if os.path.exists(f"{results_dir}/cpu_multi.yaml"):
-        with open(f"{results_dir}/cpu_multi.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| CPU Multi Core | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| CPU Multi Core | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| CPU Multi Core | ❌ | No test results found |\n"
-
-    # Check CPU All Cores test
-    if os.path.exists(f"{results_dir}/cpu_all.yaml"):
-        with open(f"{results_dir}/cpu_all.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| CPU All Cores | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| CPU All Cores | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| CPU All Cores | ❌ | No test results found |\n"
-
-    # Check Memory Single test
-    if os.path.exists(f"{results_dir}/mem_single.yaml"):
-        with open(f"{results_dir}/mem_single.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| Memory Single | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| Memory Single | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| Memory Single | ❌ | No test results found |\n"
-
-    # Check Memory Multi test
-    if os.path.exists(f"{results_dir}/mem_multi.yaml"):
-        with open(f"{results_dir}/mem_multi.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| Memory Multi | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| Memory Multi | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| Memory Multi | ❌ | No test results found |\n"
-
-    # Check Disk IO Write test
-    if os.path.exists(f"{results_dir}/disk_write_test.yaml"):
-        with open(f"{results_dir}/disk_write_test.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| Disk IO Write | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| Disk IO Write | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| Disk IO Write | ❌ | No test results found |\n"
-
-    # Check Disk IO Mix test
-    if os.path.exists(f"{results_dir}/disk_io_test.yaml"):
-        with open(f"{results_dir}/disk_io_test.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| Disk IO Mix | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| Disk IO Mix | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| Disk IO Mix | ❌ | No test results found |\n"
-
-    # Check Disk Fallocate test
-    if os.path.exists(f"{results_dir}/disk_fallocate_test.yaml"):
-        with open(f"{results_dir}/disk_fallocate_test.yaml", "r") as f:
-            content = f.read()
-            if "metrics:" in content:
-                summary_md += "| Disk Fallocate | ✅ | Completed successfully |\n"
-            else:
-                summary_md += "| Disk Fallocate | ❌ | Failed or incomplete |\n"
-    else:
-        summary_md += "| Disk Fallocate | ❌ | No test results found |\n"
-
-    # Check GPU Burn test
-    if os.path.exists(f"{results_dir}/gpu_burn.log"):
-        with open(f"{results_dir}/gpu_burn.log", "r") as f:
-            content = f.read()
-            if "OK" in content:
-                summary_md += "| GPU Burn Test | ✅ | Completed successfully |\n"
-            elif "(DIED!)" in content or "ERROR" in content or "Failed" in content:
-                summary_md += "| GPU Burn Test | ❌ | Test failed with errors |\n"
-            elif os.path.getsize(f"{results_dir}/gpu_burn.log") > 0:
-                summary_md += "| GPU Burn Test | ⚠️ | Completed with warnings |\n"
-            else:
-                summary_md += "| GPU Burn Test | ❌ | Test output empty |\n"
-    else:
-        summary_md += "| GPU Burn Test | ❌ | No test results found |\n"
-
-    # Check glmark2 benchmark test
-    if os.path.exists(f"{results_dir}/glmark2.log"):
-        with open(f"{results_dir}/glmark2.log", "r") as f:
-            content = f.read()
-            if "glmark2 Score:" in content:
-                summary_md += "| glmark2 Benchmark | ✅ | Completed successfully |\n"
-            else:
-                summary_md += (
-                    "| glmark2 Benchmark | ⚠️ | Completed but may have issues |\n"
-                )
-    else:
-        summary_md += "| glmark2 Benchmark | ❌ | No test results found |\n"
+    # Same evaluation as check_results so the report and exit code agree
+    for record in evaluate_results(results_dir, thresholds):
+        if record["status"] == PASS:
+            summary_md += f"| {record['name']} | ✅ | Completed successfully |\n"
+        else:
+            details = "; ".join(record["reasons"]) or "Failed or incomplete"
+            summary_md += f"| {record['name']} | ❌ | {details} |\n"
 
     with open(f"{src_dir}/chapter_summary.md", "w") as f:
         f.write(summary_md)
@@ -134,25 +33,14 @@ def create_system_md(results_dir, src_dir):
     """Create the system information chapter in markdown format"""
     sys_md = "# System Information\n```\n"
 
-    if os.path.exists(f"{results_dir}/system_info.txt"):
-        # Filter out identifying information from system info
-        if os.path.exists(f"{results_dir}/system_info.txt"):
-            with open(f"{results_dir}/system_info.txt", "r") as f:
-                content = f.read()
-                # Remove identifying information
-                lines = content.split("\n")
-                for i, line in enumerate(lines):
-                    # Filter hostname, user, and other identifying info
-                    if "hostname:" in line.lower():
-                        lines[i] = "hostname: [REDACTED]"
-                    elif "run-by:" in line.lower():
-                        lines[i] = "run-by: [REDACTED]"
-                    elif "user" in line.lower() and "@" in line:
-                        lines[i] = line.split("@")[0] + "@[REDACTED]"
-                    elif "/home/" in line:
-                        lines[i] = line.replace("/home/christian", "/home/[USER]")
-
-                sys_md += "\n".join(lines)
+    inventory = load_inventory(f"{results_dir}/system_info.json")
+    if inventory:
+        # The inventory is already redacted by collect_sysinfo.py
+        sys_md += format_inventory(inventory)
+    elif result_exists(f"{results_dir}/system_info.txt"):
+        # Older runs only have the raw text output
+        with open_result(f"{results_dir}/system_info.txt") as f:
+            sys_md += redact_text(f.read())
     else:
         sys_md += "No system information available\n"
 
@@ -162,14 +50,50 @@ def create_system_md(results_dir, src_dir):
         f.write(sys_md)
 
 
+def create_env_md(results_dir, src_dir):
+    """Create the benchmark environment chapter in markdown format"""
+    env_md = "# Benchmark Environment\n"
+
+    records = load_preflight(f"{results_dir}/preflight.json")
+    if not records:
+        env_md += "No preflight information available\n"
+    else:
+        env_md += "| Test | Controlled | Governor | Turbo | Busy | Cache Dropped |\n"
+        env_md += "|------|------------|----------|-------|------|---------------|\n"
+        for test, record in records.items():
+            governors = ", ".join(sorted(set(record["governors"].values()))) or "n/a"
+            turbo = {True: "on", False: "off"}.get(record["turbo"], "n/a")
+            busy = record["activity"].get("busy_percent")
+            busy = f"{busy:.1f}%" if busy is not None else "n/a"
+            env_md += (
+                f"| {test} | {'yes' if record['controlled'] else 'no'} "
+                f"| {governors} | {turbo} | {busy} "
+                f"| {'yes' if record['caches_dropped'] else 'no'} |\n"
+            )
+
+        # Flag everything that was left uncontrolled
+        env_md += "\n## Noise Sources\n"
+        noisy = [(test, r["noise"]) for test, r in records.items() if r["noise"]]
+        if noisy:
+            for test, noise in noisy:
+                env_md += f"\n### {test}\n"
+                for line in noise:
+                    env_md += f"- ⚠️ {line}\n"
+        else:
+            env_md += "No uncontrolled noise sources detected.\n"
+
+    with open(f"{src_dir}/chapter_env.md", "w") as f:
+        f.write(env_md)
+
+
 def create_cpu_md(results_dir, src_dir):
     """Create the CPU test results chapter in markdown format"""
     cpu_md = "# CPU Stress Test Results\n"
 
     # Single Core Test
     cpu_md += "\n## Single Core Test\n```yaml\n"
-    if os.path.exists(f"{results_dir}/cpu_single.yaml"):
-        with open(f"{results_dir}/cpu_single.yaml", "r") as f:
+    if result_exists(f"{results_dir}/cpu_single.yaml"):
+        with open_result(f"{results_dir}/cpu_single.yaml") as f:
             cpu_md += f.read()
     else:
         cpu_md += "No results available\n"
@@ -177,8 +101,8 @@ def create_cpu_md(results_dir, src_dir):
 
     # Multi-Core Test
     cpu_md += "\n## Multi-Core Test (4 cores)\n```yaml\n"
-    if os.path.exists(f"{results_dir}/cpu_multi.yaml"):
-        with open(f"{results_dir}/cpu_multi.yaml", "r") as f:
+    if result_exists(f"{results_dir}/cpu_multi.yaml"):
+        with open_result(f"{results_dir}/cpu_multi.yaml") as f:
             cpu_md += f.read()
     else:
         cpu_md += "No results available\n"
@@ -186,8 +110,8 @@ def create_cpu_md(results_dir, src_dir):
 
     # All Cores Test
     cpu_md += "\n## All Cores Test\n```yaml\n"
-    if os.path.exists(f"{results_dir}/cpu_all.yaml"):
-        with open(f"{results_dir}/cpu_all.yaml", "r") as f:
+    if result_exists(f"{results_dir}/cpu_all.yaml"):
+        with open_result(f"{results_dir}/cpu_all.yaml") as f:
             cpu_md += f.read()
     else:
         cpu_md += "No results available\n"
@@ -203,8 +127,8 @@ def create_mem_md(results_dir, src_dir):
 
     # Single Memory Test
     mem_md += "\n## Single Memory Test\n```yaml\n"
-    if os.path.exists(f"{results_dir}/mem_single.yaml"):
-        with open(f"{results_dir}/mem_single.yaml", "r") as f:
+    if result_exists(f"{results_dir}/mem_single.yaml"):
+        with open_result(f"{results_dir}/mem_single.yaml") as f:
             mem_md += f.read()
     else:
         mem_md += "No results available\n"
@@ -212,8 +136,8 @@ def create_mem_md(results_dir, src_dir):
 
     # Multiple Memory Test
     mem_md += "\n## Multiple Memory Test (4 instances)\n```yaml\n"
-    if os.path.exists(f"{results_dir}/mem_multi.yaml"):
-        with open(f"{results_dir}/mem_multi.yaml", "r") as f:
+    if result_exists(f"{results_dir}/mem_multi.yaml"):
+        with open_result(f"{results_dir}/mem_multi.yaml") as f:
             mem_md += f.read()
     else:
         mem_md += "No results available\n"
@@ -229,8 +153,8 @@ def create_disk_md(results_dir, src_dir):
 
     # Disk IO Write Test
     disk_md += "\n## Disk IO Write Test\n```yaml\n"
-    if os.path.exists(f"{results_dir}/disk_write_test.yaml"):
-        with open(f"{results_dir}/disk_write_test.yaml", "r") as f:
+    if result_exists(f"{results_dir}/disk_write_test.yaml"):
+        with open_result(f"{results_dir}/disk_write_test.yaml") as f:
             disk_md += f.read()
     else:
         disk_md += "No results available\n"
@@ -238,8 +162,8 @@ def create_disk_md(results_dir, src_dir):
 
     # Disk IO Mix Test
     disk_md += "\n## Disk IO Mix Test\n```yaml\n"
-    if os.path.exists(f"{results_dir}/disk_io_test.yaml"):
-        with open(f"{results_dir}/disk_io_test.yaml", "r") as f:
+    if result_exists(f"{results_dir}/disk_io_test.yaml"):
+        with open_result(f"{results_dir}/disk_io_test.yaml") as f:
             disk_md += f.read()
     else:
         disk_md += "No results available\n"
@@ -247,8 +171,8 @@ def create_disk_md(results_dir, src_dir):
 
     # Disk Fallocate Test
     disk_md += "\n## Disk Fallocate Test\n```yaml\n"
-    if os.path.exists(f"{results_dir}/disk_fallocate_test.yaml"):
-        with open(f"{results_dir}/disk_fallocate_test.yaml", "r") as f:
+    if result_exists(f"{results_dir}/disk_fallocate_test.yaml"):
+        with open_result(f"{results_dir}/disk_fallocate_test.yaml") as f:
             disk_md += f.read()
     else:
         disk_md += "No results available\n"
@@ -264,8 +188,8 @@ def create_gpu_md(results_dir, src_dir):
 
     # GPU Burn Test
     gpu_md += "\n## GPU Burn Test\n```\n"
-    if os.path.exists(f"{results_dir}/gpu_burn.log"):
-        with open(f"{results_dir}/gpu_burn.log", "r") as f:
+    if result_exists(f"{results_dir}/gpu_burn.log"):
+        with open_result(f"{results_dir}/gpu_burn.log") as f:
             gpu_md += f.read()
     else:
         gpu_md += "No results available\n"
@@ -273,8 +197,8 @@ def create_gpu_md(results_dir, src_dir):
 
     # glmark2 Benchmark Test
     gpu_md += "\n## glmark2 Benchmark Test\n```\n"
-    if os.path.exists(f"{results_dir}/glmark2.log"):
-        with open(f"{results_dir}/glmark2.log", "r") as f:
+    if result_exists(f"{results_dir}/glmark2.log"):
+        with open_result(f"{results_dir}/glmark2.log") as f:
             # Read the content and replace problematic HTML-like tags
             content = f.read()
             # Replace <default> with [default] to avoid markdown parsing issues
@@ -292,11 +216,11 @@ def create_gpu_md(results_dir, src_dir):
     gpu_md += "```\n"
 
     # Add glmark2 summary if available
-    if os.path.exists(f"{results_dir}/glmark2_data.json"):
+    if result_exists(f"{results_dir}/glmark2_data.json"):
         try:
             import json
 
-            with open(f"{results_dir}/glmark2_data.json", "r") as f:
+            with open_result(f"{results_dir}/glmark2_data.json") as f:
                 glmark2_data = json.load(f)
 
             if "overall_score" in glmark2_data:
@@ -315,6 +239,21 @@ def create_gpu_md(results_dir, src_dir):
                 gpu_md += f"- Min FPS: {summary['min_fps']}\n"
                 gpu_md += f"- Max FPS: {summary['max_fps']}\n"
 
+            if glmark2_data.get("scenes"):
+                runs = glmark2_data.get("runs", 1)
+                plural = "s" if runs != 1 else ""
+                gpu_md += f"\n**Scene Results ({runs} run{plural}):**\n\n"
+                gpu_md += "| Scene | Options | FPS | Frame Time (ms) |\n"
+                gpu_md += "|-------|---------|-----|-----------------|\n"
+                for scene in glmark2_data["scenes"]:
+                    fps = f"{scene['fps_mean']:.1f}"
+                    if scene["fps_stddev"] is not None:
+                        fps += f" ± {scene['fps_stddev']:.1f}"
+                    gpu_md += (
+                        f"| {scene['scene']} | `{scene['options']}` | {fps} "
+                        f"| {scene['frame_time_ms_mean']:.3f} |\n"
+                    )
+
         except Exception:
             gpu_md += "\nError loading glmark2 summary data\n"
 
@@ -340,6 +279,24 @@ def create_plots_md(plots_dir, src_dir):
     )
     plots_md += "![Memory Performance](plots/memory_performance.png)\n"
 
+    # CPU Energy Efficiency (if available)
+    if os.path.exists(f"{plots_dir}/cpu_efficiency.png"):
+        plots_md += "\n## CPU Energy Efficiency\n"
+        plots_md += (
+            "The following chart shows CPU throughput next to bogo operations per "
+            "joule of package and DRAM energy:\n"
+        )
+        plots_md += "![CPU Energy Efficiency](plots/cpu_efficiency.png)\n"
+
+    # Memory Energy Efficiency (if available)
+    if os.path.exists(f"{plots_dir}/memory_efficiency.png"):
+        plots_md += "\n## Memory Energy Efficiency\n"
+        plots_md += (
+            "The following chart shows memory throughput next to bogo operations "
+            "per joule of package and DRAM energy:\n"
+        )
+        plots_md += "![Memory Energy Efficiency](plots/memory_efficiency.png)\n"
+
     # Disk IO Performance (if available)
     if os.path.exists(f"{plots_dir}/disk_io_performance.png"):
         plots_md += "\n## Disk IO Performance\n"
@@ -391,7 +348,7 @@ def create_plots_md(plots_dir, src_dir):
         f.write(plots_md)
 
 
-def generate_report(report_dir="report"):
+def generate_report(report_dir="report", config_file="thresholds.yaml"):
     """Generate the complete stress test report"""
     results_dir = f"{report_dir}/results"
     src_dir = f"{report_dir}/src"
@@ -407,6 +364,7 @@ def generate_report(report_dir="report"):
     summary_md += "- [Introduction](chapter_1.md)\n"
     summary_md += "- [Test Summary](chapter_summary.md)\n"
     summary_md += "- [System Information](chapter_sys.md)\n"
+    summary_md += "- [Benchmark Environment](chapter_env.md)\n"
     summary_md += "- [CPU Test Results](chapter_cpu.md)\n"
     summary_md += "- [Memory Test Results](chapter_mem.md)\n"
     summary_md += "- [Disk IO Test Results](chapter_disk.md)\n"
@@ -426,17 +384,26 @@ def generate_report(report_dir="report"):
         f.write(intro_md)
 
     # Create all other chapters
-    create_summary_md(results_dir, src_dir)
-    create_system_md(results_dir, src_dir)
-    create_cpu_md(results_dir, src_dir)
-    create_mem_md(results_dir, src_dir)
-    create_disk_md(results_dir, src_dir)
-    create_gpu_md(results_dir, src_dir)
-    create_plots_md(plots_dir, src_dir)
+    thresholds = load_thresholds(config_file if os.path.exists(config_file) else None)
+    chapters = [
+        ("chapter_summary", partial(create_summary_md, thresholds=thresholds), results_dir),
+        ("chapter_sys", create_system_md, results_dir),
+        ("chapter_env", create_env_md, results_dir),
+        ("chapter_cpu", create_cpu_md, results_dir),
+        ("chapter_mem", create_mem_md, results_dir),
+        ("chapter_disk", create_disk_md, results_dir),
+        ("chapter_gpu", create_gpu_md, results_dir),
+        ("chapter_plots", create_plots_md, plots_dir),
+    ]
+    for name, create_chapter, input_dir in chapters:
+        with span(f"report:{name}", "report"):
+            create_chapter(input_dir, src_dir)
 
     print(f"Report generated in {report_dir}/src/")
 
 
 if __name__ == "__main__":
     report_dir = sys.argv[1] if len(sys.argv) > 1 else "report"
-    generate_report(report_dir)
+    config_file = sys.argv[2] if len(sys.argv) > 2 else "thresholds.yaml"
+    with span("generate_report", "script", profile=True):
+        generate_report(report_dir, config_file)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+DEFAULT_SOURCE = "https://github.com/wilicc/gpu-burn"
+DEFAULT_CACHE_DIR = ".cache/gpu-burn"
+DEFAULT_BUILD_CMD = "make COMPUTE={compute}"
+DEFAULT_TOOLCHAIN_CMD = "nvcc --version"
+
+# Files gpu_burn needs at runtime, copied from the build into the cache
+ARTIFACTS = ["gpu_burn", "compare.ptx"]
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run(command, cwd=None):
+    """Run a command and return its stripped stdout, raising on failure"""
+    result = subprocess.run(
+        command, cwd=cwd, check=True, stdout=subprocess.PIPE, text=True
+    )
+    return result.stdout.strip()
+
+
+def detect_compute_capability():
+    """Detect the GPU compute capability with detect_gpu.sh"""
+    return run(["bash", os.path.join(SCRIPT_DIR, "detect_gpu.sh")])
+
+
+def toolchain_version(command):
+    """
+    Identify the build toolchain
+
+    Args:
+        command (str): Command printing the toolchain version
+
+    Returns:
+        str: Version output, or "unknown" if the command is unavailable
+    """
+    try:
+        return run(shlex.split(command))
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def update_source(source_dir, url, ref="HEAD", fetch=True):
+    """
+    Clone or update the gpu-burn source checkout
+
+    Args:
+        source_dir (str): Local checkout kept between runs
+        url (str): Repository to fetch from, a URL or a local mirror path
+        ref (str): Branch, tag or commit to build
+        fetch (bool): Fetch from url, otherwise reuse the existing checkout
+
+    Returns:
+        str: Commit hash of the checked out source
+    """
+    if not os.path.isdir(os.path.join(source_dir, ".git")):
+        if not fetch:
+            raise RuntimeError(f"No gpu-burn source in {source_dir} and fetch disabled")
+        os.makedirs(os.path.dirname(os.path.abspath(source_dir)), exist_ok=True)
+        run(["git", "clone", "--quiet", url, source_dir])
+
+    if fetch:
+        try:
+            run(["git", "fetch", "--quiet", url, ref], cwd=source_dir)
+            run(
+                ["git", "checkout", "--quiet", "--detach", "FETCH_HEAD"],
+                cwd=source_dir,
+            )
+        except subprocess.CalledProcessError:
+            print(
+                f"Warning: Could not fetch {ref} from {url}, using cached source",
+                file=sys.stderr,
+            )
+
+    return run(["git", "rev-parse", "HEAD"], cwd=source_dir)
+
+
+def cache_key(compute, commit, toolchain):
+    """Build a cache key from compute capability, source commit and toolchain"""
+    digest = hashlib.sha256(f"{compute}\n{commit}\n{toolchain}".encode("utf-8"))
+    return f"sm{compute.replace('.', '')}-{commit[:12]}-{digest.hexdigest()[:12]}"
+
+
+def is_cached(build_dir):
+    """Check that a cached build is complete"""
+    return os.path.exists(os.path.join(build_dir, "build.json")) and all(
+        os.path.exists(os.path.join(build_dir, name)) for name in ARTIFACTS
+    )
+
+
+def build(source_dir, build_dir, build_cmd, compute, metadata):
+    """
+    Build gpu-burn from a clean copy of the source into the cache
+
+    The build runs in a temporary directory next to the cache entry, which
+    is moved into place only after every artifact exists, so an interrupted
+    build never leaves a half-populated cache entry behind.
+    """
+    parent_dir = os.path.dirname(build_dir)
+    os.makedirs(parent_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".build-", dir=parent_dir)
+    try:
+        src_copy = os.path.join(work_dir, "src")
+        shutil.copytree(source_dir, src_copy, ignore=shutil.ignore_patterns(".git"))
+
+        command = build_cmd.format(compute=compute)
+        print(f"Building gpu-burn with compute capability {compute}: {command}")
+        subprocess.run(shlex.split(command), cwd=src_copy, check=True)
+
+        output_dir = os.path.join(work_dir, "out")
+        os.makedirs(output_dir)
+        for name in ARTIFACTS:
+            shutil.copy2(os.path.join(src_copy, name), os.path.join(output_dir, name))
+        with open(os.path.join(output_dir, "build.json"), "w") as f:
+            json.dump(metadata, f, indent=2)
+
+        if os.path.exists(build_dir):
+            shutil.rmtree(build_dir)
+        os.replace(output_dir, build_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def link_build(build_dir, link_path):
+    """Point link_path at the cached build directory"""
+    if os.path.islink(link_path) or os.path.isfile(link_path):
+        os.remove(link_path)
+    elif os.path.isdir(link_path):
+        # Checkout left behind by the uncached gpu_stress recipe
+        shutil.rmtree(link_path)
+    os.symlink(os.path.abspath(build_dir), link_path)
+
+
+def get_build(
+    cache_dir=DEFAULT_CACHE_DIR,
+    url=DEFAULT_SOURCE,
+    ref="HEAD",
+    compute=None,
+    build_cmd=DEFAULT_BUILD_CMD,
+    toolchain_cmd=DEFAULT_TOOLCHAIN_CMD,
+    rebuild=False,
+    fetch=True,
+):
+    """
+    Return a gpu-burn build for this GPU, building it only when needed
+
+    Returns:
+        tuple: (build directory, True if it was reused from the cache)
+    """
+    compute = compute or detect_compute_capability()
+    commit = update_source(os.path.join(cache_dir, "src"), url, ref, fetch)
+    toolchain = toolchain_version(toolchain_cmd)
+    key = cache_key(compute, commit, toolchain)
+    build_dir = os.path.join(cache_dir, "builds", key)
+
+    if is_cached(build_dir) and not rebuild:
+        print(f"Using cached gpu-burn build {key}")
+        return build_dir, True
+
+    metadata = {
+        "key": key,
+        "compute_capability": compute,
+        "commit": commit,
+        "toolchain": toolchain,
+        "source": url,
+        "built": datetime.now().isoformat(),
+    }
+    build(os.path.join(cache_dir, "src"), build_dir, build_cmd, compute, metadata)
+    return build_dir, False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build gpu-burn once per compute capability, source and toolchain"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Build cache directory (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--mirror",
+        default=os.environ.get("GPU_BURN_MIRROR"),
+        help="Local git mirror to fetch from instead of GitHub "
+        "(default: $GPU_BURN_MIRROR)",
+    )
+    parser.add_argument("--ref", default="HEAD", help="Source revision to build")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Do not fetch, build the source already in the cache",
+    )
+    parser.add_argument(
+        "--compute", help="Compute capability (default: detect_gpu.sh)"
+    )
+    parser.add_argument(
+        "--build-cmd",
+        default=DEFAULT_BUILD_CMD,
+        help=f"Build command run in the source copy (default: {DEFAULT_BUILD_CMD})",
+    )
+    parser.add_argument(
+        "--toolchain-cmd",
+        default=DEFAULT_TOOLCHAIN_CMD,
+        help=f"Command identifying the toolchain (default: {DEFAULT_TOOLCHAIN_CMD})",
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild even if a cached build exists"
+    )
+    parser.add_argument(
+        "--link", help="Create a symlink at this path pointing to the build"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        build_dir, _ = get_build(
+            cache_dir=args.cache_dir,
+            url=args.mirror or DEFAULT_SOURCE,
+            ref=args.ref,
+            compute=args.compute,
+            build_cmd=args.build_cmd,
+            toolchain_cmd=args.toolchain_cmd,
+            rebuild=args.rebuild,
+            fetch=not args.offline,
+        )
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"Error: gpu-burn build failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.link:
+        link_build(build_dir, args.link)
+    print(build_dir)
+
+
+if __name__ == "__main__":
+    main()
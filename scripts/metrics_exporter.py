@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from check_results import NO_RESULTS, PASS, evaluate_results
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Logs written while their test runs. They are left out of the results stamp so
+# a growing log does not re-parse every result once per refresh, the finished
+# test is picked up when its extracted data file is written.
+LIVE_LOGS = ("gpu_burn.log", "glmark2.log")
+
+GPU_BURN_PATTERN = re.compile(
+    r"([\d.]+)%.*proc.d:.*\(([\d]+) Gflop/s\).*temps: ([\d]+) C"
+)
+
+
+def mark_stage(state_file, test, duration=None):
+    """
+    Record the test that is currently running
+
+    Args:
+        state_file (str): Path to the exporter state file
+        test (str): Name of the test or pipeline stage
+        duration (float): Expected duration in seconds, if known
+    """
+    state = {"test": test, "started": time.time(), "duration": duration}
+    state_dir = os.path.dirname(state_file)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+
+class LogFollower:
+    """Incrementally read new lines from a log file that may be rewritten"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.partial = ""
+
+    def read_lines(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+
+        # Start over when the log is replaced or truncated by a new run
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.partial = ""
+
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "r", errors="replace") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+            self.offset = f.tell()
+
+        # gpu_burn redraws its progress line with carriage returns
+        lines = (self.partial + chunk).replace("\r", "\n").split("\n")
+        self.partial = lines.pop()
+        return lines
+
+
+class MetricsCollector:
+    """
+    Keep an up to date snapshot of the stress test metrics
+
+    A background thread refreshes the snapshot at a fixed interval, so a
+    scrape only formats values that are already in memory and never touches
+    the result files itself.
+    """
+
+    def __init__(self, results_dir, state_file, interval=1.0):
+        self.results_dir = results_dir
+        self.state_file = state_file
+        self.interval = interval
+        self.gpu_burn = LogFollower(f"{results_dir}/gpu_burn.log")
+        self.gpu_sample = None
+        self.results_stamp = None
+        self.results = []
+        self.lock = threading.Lock()
+        self.snapshot = ""
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _results_stamp(self):
+        try:
+            return tuple(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in sorted(os.scandir(self.results_dir), key=lambda e: e.name)
+                if entry.is_file() and entry.name not in LIVE_LOGS
+            )
+        except OSError:
+            return None
+
+    def _read_state(self):
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def refresh(self):
+        """Update the gpu_burn stream, the final results and the snapshot"""
+        for line in self.gpu_burn.read_lines():
+            match = GPU_BURN_PATTERN.search(line)
+            if match:
+                self.gpu_sample = (
+                    float(match.group(1)),
+                    float(match.group(2)),
+                    float(match.group(3)),
+                )
+
+        # Only re-parse the results when a finished result file changed
+        stamp = self._results_stamp()
+        if stamp != self.results_stamp:
+            self.results_stamp = stamp
+            try:
+                self.results = evaluate_results(self.results_dir) if stamp else []
+            except Exception as e:
+                print(f"Error evaluating results: {e}", file=sys.stderr)
+
+        snapshot = format_metrics(self._read_state(), self.gpu_sample, self.results)
+        with self.lock:
+            self.snapshot = snapshot
+
+    def render(self):
+        with self.lock:
+            return self.snapshot
+
+    def _run(self, on_refresh=None):
+        while not self.stop_event.is_set():
+            try:
+                self.refresh()
+                if on_refresh:
+                    on_refresh(self.render())
+            except Exception as e:
+                print(f"Error refreshing metrics: {e}", file=sys.stderr)
+            self.stop_event.wait(self.interval)
+
+    def start(self, on_refresh=None):
+        self.refresh()
+        self.thread = threading.Thread(target=self._run, args=(on_refresh,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _value(value):
+    """Format a sample value, using the OpenMetrics spelling for non-finite floats"""
+    if isinstance(value, float) and not math.isfinite(value):
+        if math.isnan(value):
+            return "NaN"
+        return "+Inf" if value > 0 else "-Inf"
+    # Full precision, ":g" would round final results to six digits
+    return str(value)
+
+
+def format_metrics(state, gpu_sample, results, now=None):
+    """
+    Format the current metrics in OpenMetrics text format
+
+    Args:
+        state (dict): Current test state written by mark_stage, may be None
+        gpu_sample (tuple): Latest (percent, gflops, temperature) from gpu_burn
+        results (list): Result records from check_results.evaluate_results
+
+    Returns:
+        str: OpenMetrics exposition ending with "# EOF"
+    """
+    now = time.time() if now is None else now
+    lines = []
+
+    def family(name, metric_type, help_text):
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"# HELP {name} {help_text}")
+
+    family("stress_test_current", "info", "Test that is currently running")
+    if state and state.get("test"):
+        lines.append(f'stress_test_current_info{{test="{_label(state["test"])}"}} 1')
+
+    family("stress_test_progress_ratio", "gauge", "Progress of the current test")
+    if state and state.get("test"):
+        progress = None
+        if state.get("duration"):
+            elapsed = now - state["started"]
+            progress = min(max(elapsed / state["duration"], 0.0), 1.0)
+        if state["test"] == "gpu_stress" and gpu_sample:
+            progress = gpu_sample[0] / 100
+        if progress is not None:
+            lines.append(
+                f'stress_test_progress_ratio{{test="{_label(state["test"])}"}} '
+                f"{progress:.4f}"
+            )
+
+    family("stress_test_gpu_gflops", "gauge", "Latest gpu_burn throughput")
+    if gpu_sample:
+        lines.append(f"stress_test_gpu_gflops {_value(gpu_sample[1])}")
+
+    family(
+        "stress_test_gpu_temperature_celsius", "gauge", "Latest gpu_burn temperature"
+    )
+    if gpu_sample:
+        lines.append(
+            f"stress_test_gpu_temperature_celsius {_value(gpu_sample[2])}"
+        )
+
+    family("stress_test_passed", "gauge", "1 if the test passed, 0 if it failed")
+    for record in results:
+        # Tests that have not produced results yet are not failures
+        if NO_RESULTS not in record["reasons"]:
+            passed = 1 if record["status"] == PASS else 0
+            test = _label(record["test"])
+            lines.append(f'stress_test_passed{{test="{test}"}} {passed}')
+
+    numeric_metrics = [
+        ("stress_test_bogo_ops", "bogo_ops", "Final stress-ng bogo operations"),
+        (
+            "stress_test_bogo_ops_per_second",
+            "bogo_ops_per_second",
+            "Final stress-ng bogo operations per second (real time)",
+        ),
+        ("stress_test_gpu_avg_gflops", "avg_gflops", "Final gpu_burn average Gflop/s"),
+        (
+            "stress_test_gpu_max_temperature_celsius",
+            "max_temperature",
+            "Final gpu_burn maximum temperature",
+        ),
+        ("stress_test_glmark2_score", "score", "Final glmark2 score"),
+    ]
+    for name, key, help_text in numeric_metrics:
+        family(name, "gauge", help_text)
+        for record in results:
+            value = record["metrics"].get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                test = _label(record["test"])
+                lines.append(f'{name}{{test="{test}"}} {_value(value)}')
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def make_server(collector, host="127.0.0.1", port=9464):
+    """
+    Create the HTTP server exposing /metrics
+
+    Port 0 binds a free port, the chosen port is server.server_address[1].
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = collector.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    return server
+
+
+def write_textfile(path, content):
+    """Write the metrics for a textfile collector atomically"""
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        f.write(content)
+    os.replace(tmp_file, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Expose live and final stress test metrics in OpenMetrics format"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command in ["serve", "textfile"]:
+        sub = subparsers.add_parser(
+            command,
+            help="Serve metrics over HTTP"
+            if command == "serve"
+            else "Write metrics to a file for a textfile collector",
+        )
+        sub.add_argument(
+            "--results-dir",
+            default="report/results",
+            help="Directory containing test results (default: report/results)",
+        )
+        sub.add_argument(
+            "--state-file",
+            default="report/exporter_state.json",
+            help="Current test state file (default: report/exporter_state.json)",
+        )
+        sub.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds between metric refreshes (default: 1)",
+        )
+        if command == "serve":
+            sub.add_argument("--host", default="127.0.0.1", help="Address to bind")
+            sub.add_argument("--port", type=int, default=9464, help="Port to bind")
+        else:
+            sub.add_argument("output", help="Metrics file to write, e.g. *.prom")
+            sub.add_argument(
+                "--once", action="store_true", help="Write the file once and exit"
+            )
+
+    mark_parser = subparsers.add_parser("mark", help="Record the current test")
+    mark_parser.add_argument("test", help="Name of the test that is starting")
+    mark_parser.add_argument(
+        "duration", nargs="?", type=float, help="Expected duration in seconds"
+    )
+    mark_parser.add_argument(
+        "--state-file",
+        default="report/exporter_state.json",
+        help="Current test state file (default: report/exporter_state.json)",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "mark":
+        mark_stage(args.state_file, args.test, args.duration)
+        return
+
+    collector = MetricsCollector(args.results_dir, args.state_file, args.interval)
+
+    if args.command == "textfile":
+        if args.once:
+            collector.refresh()
+            write_textfile(args.output, collector.render())
+            return
+        collector.start(lambda content: write_textfile(args.output, content))
+        print(f"Writing metrics to {args.output} every {args.interval:g}s")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            collector.stop()
+        return
+
+    collector.start()
+    server = make_server(collector, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Serving metrics on http://{host}:{port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        collector.stop()
+
+
+if __name__ == "__main__":
+    main()
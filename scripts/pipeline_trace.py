@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Lightweight self-profiling for the stress test pipeline
+
+Every stage records a start/end span as one JSON line in the file named by
+the STRESS_TRACE_EVENTS environment variable. When the variable is unset all
+spans are no-ops, so instrumented scripts behave exactly as before. Spans
+from the justfile recipes, the parsers, the plots and the report chapters all
+land in the same file and can be turned into a Chrome trace-event JSON
+(chrome://tracing or https://ui.perfetto.dev) plus a summary table.
+
+Setting STRESS_TRACE_PROFILE to a directory additionally saves cProfile
+output for spans started with profile=True.
+"""
+import argparse
+import cProfile
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+EVENTS_ENV = "STRESS_TRACE_EVENTS"
+PROFILE_ENV = "STRESS_TRACE_PROFILE"
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+def record_event(name, category, start_us, duration_us, args=None):
+    """
+    Append one complete ("X") trace event to the events file
+
+    Args:
+        name (str): Span name
+        category (str): Span category (recipe, parse, plot, report, ...)
+        start_us (int): Wall clock start time in microseconds
+        duration_us (int): Span duration in microseconds
+        args (dict): Extra data shown in the trace viewer
+    """
+    events_file = os.environ.get(EVENTS_ENV)
+    if not events_file:
+        return
+
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start_us,
+        "dur": duration_us,
+        "pid": os.getpid(),
+        "tid": threading.get_ident() % 1000000,
+    }
+    if args:
+        event["args"] = args
+
+    events_dir = os.path.dirname(events_file)
+    if events_dir:
+        os.makedirs(events_dir, exist_ok=True)
+    # A single append per event keeps lines intact across processes
+    with open(events_file, "a") as f:
+        f.write(json.dumps(event) + "\n")
+
+
+def _profile_path(name):
+    safe_name = re.sub(r"[^\w.-]+", "_", name)
+    return os.path.join(os.environ[PROFILE_ENV], f"{safe_name}.{os.getpid()}.prof")
+
+
+@contextmanager
+def span(name, category="python", profile=False, **args):
+    """
+    Time a block of code and record it as a trace span
+
+    Args:
+        name (str): Span name
+        category (str): Span category
+        profile (bool): Also collect cProfile output for this block when
+            STRESS_TRACE_PROFILE is set
+        **args: Extra data attached to the span
+    """
+    if not os.environ.get(EVENTS_ENV) and not os.environ.get(PROFILE_ENV):
+        yield
+        return
+
+    profiler = None
+    if profile and os.environ.get(PROFILE_ENV):
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    start_us = _now_us()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_us = int((time.perf_counter() - start) * 1000000)
+        if profiler:
+            profiler.disable()
+            os.makedirs(os.environ[PROFILE_ENV], exist_ok=True)
+            profiler.dump_stats(_profile_path(name))
+        record_event(name, category, start_us, duration_us, args)
+
+
+def run_command(name, category, command):
+    """
+    Run a command inside a span and return its exit code
+    """
+    with span(name, category, command=" ".join(command)):
+        return subprocess.call(command)
+
+
+def load_events(events_file):
+    """
+    Load recorded trace events, skipping partially written lines
+    """
+    events = []
+    with open(events_file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+def summarize_events(events):
+    """
+    Aggregate events by name
+
+    Returns:
+        list: (name, category, count, total_us, max_us) sorted by total time
+    """
+    totals = {}
+    for event in events:
+        key = (event["name"], event.get("cat", ""))
+        count, total, longest = totals.get(key, (0, 0, 0))
+        totals[key] = (count + 1, total + event["dur"], max(longest, event["dur"]))
+
+    rows = [
+        (name, category, count, total, longest)
+        for (name, category), (count, total, longest) in totals.items()
+    ]
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows
+
+
+def format_summary(events, top=20):
+    """
+    Format the top time consumers as a text table
+    """
+    if not events:
+        return "No trace events recorded\n"
+
+    start = min(event["ts"] for event in events)
+    end = max(event["ts"] + event["dur"] for event in events)
+    wall_us = max(end - start, 1)
+
+    lines = [
+        f"Total wall time: {wall_us / 1000000:.2f}s",
+        "",
+        f"{'Stage':40} {'Category':10} {'Calls':>5} {'Total (s)':>10} "
+        f"{'Max (s)':>9} {'% Wall':>7}",
+        "-" * 86,
+    ]
+    for name, category, count, total, longest in summarize_events(events)[:top]:
+        lines.append(
+            f"{name[:40]:40} {category[:10]:10} {count:5d} {total / 1000000:10.2f} "
+            f"{longest / 1000000:9.2f} {100 * total / wall_us:6.1f}%"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_chrome_trace(events, output_file):
+    """
+    Save the events in Chrome trace-event JSON format
+    """
+    trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+    with open(output_file, "w") as f:
+        json.dump(trace, f)
+    print(f"Chrome trace saved to {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record and summarize stress test pipeline trace spans"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run a command inside a span")
+    run_parser.add_argument("name", help="Span name")
+    run_parser.add_argument(
+        "--category", default="recipe", help="Span category (default: recipe)"
+    )
+    run_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="-- command ...")
+
+    report_parser = subparsers.add_parser(
+        "report", help="Write a Chrome trace and print the top time consumers"
+    )
+    report_parser.add_argument("events_file", help="Recorded events (JSON lines)")
+    report_parser.add_argument(
+        "--output", "-o", default="trace.json", help="Chrome trace output file"
+    )
+    report_parser.add_argument("--summary", help="Also save the summary table")
+    report_parser.add_argument(
+        "--top", type=int, default=20, help="Number of stages to list (default: 20)"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        command = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+        if not command:
+            print("Error: No command given", file=sys.stderr)
+            sys.exit(2)
+        sys.exit(run_command(args.name, args.category, command))
+
+    if not os.path.exists(args.events_file):
+        print(f"Error: Events file '{args.events_file}' not found", file=sys.stderr)
+        sys.exit(1)
+
+    events = load_events(args.events_file)
+    write_chrome_trace(events, args.output)
+    summary = format_summary(events, args.top)
+    print(summary)
+    if args.summary:
+        with open(args.summary, "w") as f:
+            f.write(summary)
+
+
+if __name__ == "__main__":
+    main()
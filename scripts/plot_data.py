@@ -10,11 +10,16 @@ import yaml
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+from energy import bogo_ops_per_joule, load_energy
+from pipeline_trace import span
+from result_files import open_result, result_exists
+
 
 def get_bogo_ops(file_path):
     try:
-        with open(file_path, "r") as f:
-            data = yaml.safe_load(f)
+        with span(f"parse:{os.path.basename(file_path)}", "parse"):
+            with open_result(file_path) as f:
+                data = yaml.safe_load(f)
 
         # Handle the YAML structure from stress-ng
         if "metrics" in data:
@@ -34,103 +39,119 @@ def get_bogo_ops(file_path):
     return 0
 
 
-# Create plots directory if it doesn't exist
-os.makedirs("report/plots", exist_ok=True)
-
-# Extract data from YAML files
-cpu_single = get_bogo_ops("report/results/cpu_single.yaml")
-cpu_multi = get_bogo_ops("report/results/cpu_multi.yaml")
-cpu_all = get_bogo_ops("report/results/cpu_all.yaml")
-mem_single = get_bogo_ops("report/results/mem_single.yaml")
-mem_multi = get_bogo_ops("report/results/mem_multi.yaml")
-
-# Extract disk IO test data
-disk_write_test = get_bogo_ops("report/results/disk_write_test.yaml")
-disk_io_test = get_bogo_ops("report/results/disk_io_test.yaml")
-disk_fallocate_test = get_bogo_ops("report/results/disk_fallocate_test.yaml")
-
-# Plot CPU performance
-plt.figure(figsize=(10, 6))
-bars = plt.bar(
-    ["Single Core", "Multi Core", "All Cores"], [cpu_single, cpu_multi, cpu_all]
-)
-plt.bar_label(bars)
-plt.title("CPU Stress Test Performance")
-plt.ylabel("Bogo Operations")
-plt.savefig("report/plots/cpu_performance.png")
-plt.close()
-
-# Plot Memory performance
-plt.figure(figsize=(10, 6))
-bars = plt.bar(["Single VM", "Multi VM"], [mem_single, mem_multi])
-plt.bar_label(bars)
-plt.title("Memory Stress Test Performance")
-plt.ylabel("Bogo Operations")
-plt.savefig("report/plots/memory_performance.png")
-plt.close()
-
-# Plot Disk IO performance
-plt.figure(figsize=(10, 6))
-bars = plt.bar(
-    ["HDD Write", "IO Mix", "Fallocate"],
-    [disk_write_test, disk_io_test, disk_fallocate_test],
-)
-plt.bar_label(bars)
-plt.title("Disk IO Stress Test Performance")
-plt.ylabel("Bogo Operations")
-plt.savefig("report/plots/disk_io_performance.png")
-plt.close()
-
-# Plot GPU performance if requested and data is available
-if "--with-gpu" in sys.argv:
-    # First, try to plot GPU burn test data
+def plot_bar_chart(labels, values, title, output_file):
+    """Plot a bogo-ops bar chart for a group of stress-ng tests"""
+    with span(f"plot:{os.path.basename(output_file)}", "plot"):
+        plt.figure(figsize=(10, 6))
+        bars = plt.bar(labels, values)
+        plt.bar_label(bars)
+        plt.title(title)
+        plt.ylabel("Bogo Operations")
+        plt.savefig(output_file)
+        plt.close()
+
+
+def plot_efficiency(labels, values, energies, title, output_file):
+    """
+    Plot throughput next to bogo-ops per joule for a group of stress-ng tests
+
+    Args:
+        labels (list): Test labels
+        values (list): Bogo operations per test
+        energies (list): Energy measurements per test, None where unavailable
+        title (str): Chart title
+        output_file (str): Path of the PNG to write
+
+    Returns:
+        bool: False if no test in the group has energy data
+    """
+    if not any(energies):
+        return False
+
+    efficiency = [bogo_ops_per_joule(v, e) or 0 for v, e in zip(values, energies)]
+    power = [e["avg_power_w"] if e and e.get("avg_power_w") else None for e in energies]
+
+    with span(f"plot:{os.path.basename(output_file)}", "plot"):
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        bars = ax1.bar(labels, values)
+        ax1.bar_label(bars)
+        ax1.set_title("Throughput")
+        ax1.set_ylabel("Bogo Operations")
+
+        bars = ax2.bar(labels, efficiency, color="tab:green")
+        ax2.bar_label(
+            bars,
+            labels=[
+                f"{eff:.1f}\n{watts:.1f} W" if watts else "n/a"
+                for eff, watts in zip(efficiency, power)
+            ],
+        )
+        ax2.set_title("Energy Efficiency (average power below value)")
+        ax2.set_ylabel("Bogo Operations per Joule")
+
+        fig.suptitle(title)
+        fig.tight_layout()
+        plt.savefig(output_file)
+        plt.close()
+    return True
+
+
+def plot_gpu_burn(results_dir, plots_dir):
+    """Plot GPU burn performance and temperature from the extracted CSV data"""
     gpu_data = []
-    csv_file = "report/results/gpu_burn_data.csv"
+    csv_file = f"{results_dir}/gpu_burn_data.csv"
 
-    if os.path.exists(csv_file):
+    if result_exists(csv_file):
         try:
-            with open(csv_file, "r") as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip header
-                for row in reader:
-                    if len(row) >= 3 and row[0] != "result":
-                        percent = float(row[0])
-                        gflops = float(row[1])
-                        temp = float(row[2])
-                        gpu_data.append((percent, gflops, temp))
+            with span("parse:gpu_burn_data.csv", "parse"):
+                with open_result(csv_file) as f:
+                    reader = csv.reader(f)
+                    next(reader)  # Skip header
+                    for row in reader:
+                        if len(row) >= 3 and row[0] != "result":
+                            percent = float(row[0])
+                            gflops = float(row[1])
+                            temp = float(row[2])
+                            gpu_data.append((percent, gflops, temp))
         except Exception as e:
             print(f"Error reading GPU data: {e}")
 
-    if gpu_data:
-        # Sort by percentage to ensure proper order
-        gpu_data.sort(key=lambda x: x[0])
+    if not gpu_data:
+        print("No GPU burn test data available for plotting")
+        return
+
+    # Sort by percentage to ensure proper order
+    gpu_data.sort(key=lambda x: x[0])
 
-        # Extract separate arrays for plotting
-        percents = [x[0] for x in gpu_data]
-        gflops = [x[1] for x in gpu_data]
-        temps = [x[2] for x in gpu_data]
+    # Extract separate arrays for plotting
+    percents = [x[0] for x in gpu_data]
+    gflops = [x[1] for x in gpu_data]
+    temps = [x[2] for x in gpu_data]
 
-        # Create GPU performance plot
+    # Create GPU performance plot
+    with span("plot:gpu_performance.png", "plot"):
         plt.figure(figsize=(10, 6))
         plt.plot(percents, gflops, "b-", marker="o")
         plt.title("GPU Performance During Stress Test")
         plt.xlabel("Test Completion (%)")
         plt.ylabel("Performance (Gflop/s)")
         plt.grid(True)
-        plt.savefig("report/plots/gpu_performance.png")
+        plt.savefig(f"{plots_dir}/gpu_performance.png")
         plt.close()
 
-        # Create GPU temperature plot
+    # Create GPU temperature plot
+    with span("plot:gpu_temperature.png", "plot"):
         plt.figure(figsize=(10, 6))
         plt.plot(percents, temps, "r-", marker="s")
         plt.title("GPU Temperature During Stress Test")
         plt.xlabel("Test Completion (%)")
         plt.ylabel("Temperature (°C)")
         plt.grid(True)
-        plt.savefig("report/plots/gpu_temperature.png")
+        plt.savefig(f"{plots_dir}/gpu_temperature.png")
         plt.close()
 
-        # Create combined GPU metrics plot
+    # Create combined GPU metrics plot
+    with span("plot:gpu_combined.png", "plot"):
         fig, ax1 = plt.subplots(figsize=(10, 6))
         color = "tab:blue"
         ax1.set_xlabel("Test Completion (%)")
@@ -146,59 +167,82 @@ if "--with-gpu" in sys.argv:
 
         plt.title("GPU Performance and Temperature During Stress Test")
         fig.tight_layout()
-        plt.savefig("report/plots/gpu_combined.png")
+        plt.savefig(f"{plots_dir}/gpu_combined.png")
         plt.close()
 
-        print("GPU burn test plots generated in report/plots/")
-    else:
-        print("No GPU burn test data available for plotting")
+    print(f"GPU burn test plots generated in {plots_dir}/")
+
+
+def plot_glmark2_scenes(plot_data, plots_dir):
+    """Plot a horizontal bar chart of the glmark2 FPS per scene"""
+    test_names = plot_data.get("test_names", [])
+    if not test_names:
+        print("No glmark2 scenes available for plotting")
+        return
+
+    with span("plot:glmark2_benchmark.png", "plot"):
+        fps_values = plot_data.get("fps_values", [])
+        # Standard deviation per scene when glmark2 ran more than once
+        fps_stddev = [s or 0 for s in plot_data.get("fps_stddev", [])]
+        # Value labels go right of the error bar when there is one
+        label_x = [
+            value + (fps_stddev[i] if fps_stddev else 0)
+            for i, value in enumerate(fps_values)
+        ]
+
+        # Grow the figure with the number of scenes so every full
+        # scene/option label stays readable
+        plt.figure(figsize=(12, max(10, 0.35 * len(test_names))))
+
+        # Create the plot, first scene at the top
+        y_pos = range(len(test_names))
+        bars = plt.barh(y_pos, fps_values, xerr=fps_stddev or None, align="center")
+        plt.yticks(y_pos, test_names, fontsize=8 if len(test_names) > 30 else 10)
+        plt.gca().invert_yaxis()
+        plt.xlabel("FPS (Frames Per Second)")
+        plt.title("glmark2 Benchmark Results")
+
+        # Add value labels to bars
+        for i, bar in enumerate(bars):
+            plt.text(
+                label_x[i] + max(fps_values) * 0.01,
+                bar.get_y() + bar.get_height() / 2,
+                f"{fps_values[i]}",
+                ha="left",
+                va="center",
+            )
+
+        plt.xlim(0, max(label_x) * 1.15)
+        plt.tight_layout()
+        plt.savefig(f"{plots_dir}/glmark2_benchmark.png")
+        plt.close()
 
-    # Now, try to plot glmark2 benchmark data
-    glmark2_plot_file = "report/results/glmark2_plot_data.json"
-    if os.path.exists(glmark2_plot_file):
-        try:
-            import json
-
-            with open(glmark2_plot_file, "r") as f:
-                plot_data = json.load(f)
-
-            # Create a horizontal bar chart for glmark2 test results
-            plt.figure(figsize=(12, 10))
-            test_names = plot_data.get("test_names", [])
-            fps_values = plot_data.get("fps_values", [])
-
-            # Create the plot
-            y_pos = range(len(test_names))
-            bars = plt.barh(y_pos, fps_values, align="center")
-            plt.yticks(y_pos, test_names)
-            plt.xlabel("FPS (Frames Per Second)")
-            plt.title("glmark2 Benchmark Results")
-
-            # Add value labels to bars
-            for i, bar in enumerate(bars):
-                width = bar.get_width()
-                plt.text(
-                    width + max(fps_values) * 0.01,
-                    bar.get_y() + bar.get_height() / 2,
-                    f"{fps_values[i]}",
-                    ha="left",
-                    va="center",
-                )
-
-            plt.tight_layout()
-            plt.savefig("report/plots/glmark2_benchmark.png")
-            plt.close()
-
-            # Also create a summary plot if overall score is available
-            glmark2_data_file = "report/results/glmark2_data.json"
-            if os.path.exists(glmark2_data_file):
-                with open(glmark2_data_file, "r") as f:
-                    glmark2_data = json.load(f)
-
-                if "overall_score" in glmark2_data and "opengl_info" in glmark2_data:
-                    score = glmark2_data["overall_score"]
-                    renderer = glmark2_data["opengl_info"].get("renderer", "Unknown")
 
+def plot_glmark2(results_dir, plots_dir):
+    """Plot glmark2 per-test FPS and the overall score"""
+    glmark2_plot_file = f"{results_dir}/glmark2_plot_data.json"
+    if not result_exists(glmark2_plot_file):
+        print("No glmark2 data available for plotting")
+        return
+
+    try:
+        with open_result(glmark2_plot_file) as f:
+            plot_data = json.load(f)
+
+        # A truncated or failed log has no scenes, the score is still plotted
+        plot_glmark2_scenes(plot_data, plots_dir)
+
+        # Also create a summary plot if overall score is available
+        glmark2_data_file = f"{results_dir}/glmark2_data.json"
+        if result_exists(glmark2_data_file):
+            with open_result(glmark2_data_file) as f:
+                glmark2_data = json.load(f)
+
+            score = glmark2_data.get("overall_score")
+            if score is not None and "opengl_info" in glmark2_data:
+                renderer = glmark2_data["opengl_info"].get("renderer", "Unknown")
+
+                with span("plot:glmark2_score.png", "plot"):
                     plt.figure(figsize=(8, 6))
                     plt.bar(["glmark2 Score"], [score], color="green")
                     plt.title(f"GPU Benchmark Score\n{renderer}")
@@ -211,13 +255,90 @@ if "--with-gpu" in sys.argv:
 
                     plt.ylim(0, score + score * 0.2)  # Add space above for text
                     plt.tight_layout()
-                    plt.savefig("report/plots/glmark2_score.png")
+                    plt.savefig(f"{plots_dir}/glmark2_score.png")
                     plt.close()
 
-            print("glmark2 benchmark plots generated in report/plots/")
-        except Exception as e:
-            print(f"Error generating glmark2 plots: {e}")
-    else:
-        print("No glmark2 data available for plotting")
-
-print("Plots generated in report/plots/")
+        print(f"glmark2 benchmark plots generated in {plots_dir}/")
+    except Exception as e:
+        print(f"Error generating glmark2 plots: {e}")
+
+
+def generate_plots(report_dir="report", with_gpu=False):
+    """Generate all performance plots for a report directory"""
+    results_dir = f"{report_dir}/results"
+    plots_dir = f"{report_dir}/plots"
+
+    # Create plots directory if it doesn't exist
+    os.makedirs(plots_dir, exist_ok=True)
+
+    # Extract data from YAML files
+    cpu_single = get_bogo_ops(f"{results_dir}/cpu_single.yaml")
+    cpu_multi = get_bogo_ops(f"{results_dir}/cpu_multi.yaml")
+    cpu_all = get_bogo_ops(f"{results_dir}/cpu_all.yaml")
+    mem_single = get_bogo_ops(f"{results_dir}/mem_single.yaml")
+    mem_multi = get_bogo_ops(f"{results_dir}/mem_multi.yaml")
+
+    # Extract disk IO test data
+    disk_write_test = get_bogo_ops(f"{results_dir}/disk_write_test.yaml")
+    disk_io_test = get_bogo_ops(f"{results_dir}/disk_io_test.yaml")
+    disk_fallocate_test = get_bogo_ops(f"{results_dir}/disk_fallocate_test.yaml")
+
+    # Plot CPU performance
+    plot_bar_chart(
+        ["Single Core", "Multi Core", "All Cores"],
+        [cpu_single, cpu_multi, cpu_all],
+        "CPU Stress Test Performance",
+        f"{plots_dir}/cpu_performance.png",
+    )
+
+    # Plot Memory performance
+    plot_bar_chart(
+        ["Single VM", "Multi VM"],
+        [mem_single, mem_multi],
+        "Memory Stress Test Performance",
+        f"{plots_dir}/memory_performance.png",
+    )
+
+    # Plot performance per watt when RAPL energy was measured
+    cpu_energy = [
+        load_energy(f"{results_dir}/{test}_energy.json")
+        for test in ["cpu_single", "cpu_multi", "cpu_all"]
+    ]
+    plot_efficiency(
+        ["Single Core", "Multi Core", "All Cores"],
+        [cpu_single, cpu_multi, cpu_all],
+        cpu_energy,
+        "CPU Performance per Joule",
+        f"{plots_dir}/cpu_efficiency.png",
+    )
+    mem_energy = [
+        load_energy(f"{results_dir}/{test}_energy.json")
+        for test in ["mem_single", "mem_multi"]
+    ]
+    plot_efficiency(
+        ["Single VM", "Multi VM"],
+        [mem_single, mem_multi],
+        mem_energy,
+        "Memory Performance per Joule",
+        f"{plots_dir}/memory_efficiency.png",
+    )
+
+    # Plot Disk IO performance
+    plot_bar_chart(
+        ["HDD Write", "IO Mix", "Fallocate"],
+        [disk_write_test, disk_io_test, disk_fallocate_test],
+        "Disk IO Stress Test Performance",
+        f"{plots_dir}/disk_io_performance.png",
+    )
+
+    # Plot GPU performance if requested and data is available
+    if with_gpu:
+        plot_gpu_burn(results_dir, plots_dir)
+        plot_glmark2(results_dir, plots_dir)
+
+    print(f"Plots generated in {plots_dir}/")
+
+
+if __name__ == "__main__":
+    with span("plot_data", "script", profile=True):
+        generate_plots(with_gpu="--with-gpu" in sys.argv)
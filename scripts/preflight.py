@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from collect_sysinfo import read_text
+from result_files import open_result
+
+# Background services known to cause bursts of CPU or disk activity
+NOISY_PROCESSES = [
+    "packagekitd",
+    "unattended-upgr",
+    "apt",
+    "dnf",
+    "updatedb",
+    "mlocate",
+    "tracker-miner-f",
+    "baloo_file",
+    "snapd",
+    "fwupd",
+    "rsync",
+]
+
+CONTROL_ENV = "STRESS_CONTROL"
+
+
+def _write(root, path, value):
+    with open(os.path.join(root, path.lstrip("/")), "w") as f:
+        f.write(str(value))
+
+
+def read_governors(root):
+    """Current scaling governor per CPU"""
+    governors = {}
+    pattern = os.path.join(root, "sys/devices/system/cpu/cpu[0-9]*/cpufreq")
+    for cpufreq_dir in sorted(glob.glob(pattern)):
+        cpu = os.path.basename(os.path.dirname(cpufreq_dir))
+        path = "/" + os.path.relpath(cpufreq_dir, root) + "/scaling_governor"
+        governor = read_text(root, path)
+        if governor:
+            governors[cpu] = governor
+    return governors
+
+
+def turbo_control(root):
+    """
+    Find the turbo switch for the active frequency driver
+
+    Returns:
+        tuple: (sysfs path, value meaning turbo is on) or (None, None)
+    """
+    intel = "/sys/devices/system/cpu/intel_pstate/no_turbo"
+    boost = "/sys/devices/system/cpu/cpufreq/boost"
+    if read_text(root, intel) is not None:
+        return intel, "0"
+    if read_text(root, boost) is not None:
+        return boost, "1"
+    return None, None
+
+
+def read_turbo(root):
+    path, on_value = turbo_control(root)
+    if path is None:
+        return None
+    return read_text(root, path) == on_value
+
+
+def _cpu_times(root):
+    fields = (read_text(root, "/proc/stat") or "").split("\n")[0].split()[1:]
+    values = [int(value) for value in fields]
+    # idle + iowait count as idle time
+    idle = sum(values[3:5]) if len(values) >= 5 else 0
+    return sum(values), idle
+
+
+def _process_times(root):
+    times = {}
+    for stat_file in glob.glob(os.path.join(root, "proc/[0-9]*/stat")):
+        try:
+            with open(stat_file, "r") as f:
+                content = f.read()
+        except OSError:
+            continue
+        # The command name is in parentheses and may contain spaces
+        name = content[content.find("(") + 1 : content.rfind(")")]
+        fields = content[content.rfind(")") + 2 :].split()
+        if len(fields) > 12:
+            pid = os.path.basename(os.path.dirname(stat_file))
+            times[pid] = (name, int(fields[11]) + int(fields[12]))
+    return times
+
+
+def sample_activity(root="/", seconds=2.0):
+    """
+    Measure how busy the system is before a test
+
+    Returns:
+        dict: Busy percentage, load average and the processes using the most
+            CPU during the sampling window
+    """
+    total_before, idle_before = _cpu_times(root)
+    procs_before = _process_times(root)
+    time.sleep(seconds)
+    total_after, idle_after = _cpu_times(root)
+    procs_after = _process_times(root)
+
+    total = total_after - total_before
+    busy = 100 * (1 - (idle_after - idle_before) / total) if total > 0 else None
+
+    cpu_count = os.cpu_count() or 1
+    top = []
+    if total > 0:
+        own_pid = str(os.getpid())
+        for pid, (name, ticks) in procs_after.items():
+            if pid == own_pid or pid not in procs_before:
+                continue
+            used = ticks - procs_before[pid][1]
+            # Percentage of one CPU, total jiffies cover every CPU
+            percent = 100 * used * cpu_count / total
+            if percent >= 5:
+                top.append({"pid": int(pid), "name": name, "cpu_percent": percent})
+    top.sort(key=lambda proc: proc["cpu_percent"], reverse=True)
+
+    loadavg = (read_text(root, "/proc/loadavg") or "").split()
+    return {
+        "busy_percent": busy,
+        "loadavg_1m": float(loadavg[0]) if loadavg else None,
+        "top_processes": top[:5],
+        "noisy_processes": sorted(
+            {name for name, _ in procs_after.values() if name in NOISY_PROCESSES}
+        ),
+    }
+
+
+def drop_caches(root="/"):
+    """Write back dirty pages and drop the page cache, dentries and inodes"""
+    subprocess.run(["sync"], check=False)
+    _write(root, "/proc/sys/vm/drop_caches", 3)
+
+
+def apply_controls(root, governor=None, disable_turbo=False):
+    """
+    Set the frequency governor and turbo state
+
+    Returns:
+        tuple: (saved state to restore later, list of settings that failed)
+    """
+    saved = {"governors": {}, "turbo": None}
+    failures = []
+
+    if governor:
+        for cpu, current in read_governors(root).items():
+            path = f"/sys/devices/system/cpu/{cpu}/cpufreq/scaling_governor"
+            try:
+                _write(root, path, governor)
+                saved["governors"][cpu] = current
+            except OSError as e:
+                failures.append(f"Could not set {cpu} governor to {governor}: {e}")
+                break
+
+    if disable_turbo:
+        path, on_value = turbo_control(root)
+        if path is None:
+            failures.append("Turbo cannot be controlled on this system")
+        else:
+            current = read_text(root, path)
+            off_value = "1" if on_value == "0" else "0"
+            try:
+                _write(root, path, off_value)
+                saved["turbo"] = {"path": path, "value": current}
+            except OSError as e:
+                failures.append(f"Could not disable turbo: {e}")
+
+    return saved, failures
+
+
+def restore_controls(root, saved):
+    """Restore the governor and turbo state saved by apply_controls"""
+    for cpu, governor in saved.get("governors", {}).items():
+        path = f"/sys/devices/system/cpu/{cpu}/cpufreq/scaling_governor"
+        try:
+            _write(root, path, governor)
+        except OSError as e:
+            print(f"Warning: Could not restore {cpu} governor: {e}", file=sys.stderr)
+    if saved.get("turbo"):
+        try:
+            _write(root, saved["turbo"]["path"], saved["turbo"]["value"])
+        except OSError as e:
+            print(f"Warning: Could not restore turbo: {e}", file=sys.stderr)
+
+
+def noise_sources(record, idle_threshold):
+    """List the uncontrolled noise sources in a preflight record"""
+    noise = list(record.get("control_failures", []))
+    governors = set(record["governors"].values())
+    if governors and governors != {"performance"}:
+        noise.append(f"CPU governor is {', '.join(sorted(governors))}, not performance")
+    if record["turbo"]:
+        noise.append("Turbo is enabled, clock speeds depend on temperature and load")
+    activity = record["activity"]
+    busy = activity.get("busy_percent")
+    if busy is not None and busy > idle_threshold:
+        noise.append(f"System not idle before the test: {busy:.1f}% CPU busy")
+    for proc in activity.get("top_processes", []):
+        noise.append(
+            f"Background process {proc['name']} (pid {proc['pid']}) used "
+            f"{proc['cpu_percent']:.0f}% CPU"
+        )
+    for name in activity.get("noisy_processes", []):
+        noise.append(f"Background service {name} is running")
+    if record["test"].startswith("disk_") and not record["caches_dropped"]:
+        noise.append("Page cache was not dropped before the disk test")
+    return noise
+
+
+def begin_test(
+    test,
+    results_file,
+    state_file,
+    root="/",
+    control=False,
+    governor="performance",
+    disable_turbo=True,
+    idle_seconds=2.0,
+    idle_threshold=10.0,
+):
+    """
+    Record the benchmark environment before a test, optionally controlling it
+
+    Returns:
+        dict: Preflight record including the list of noise sources
+    """
+    failures = []
+    saved = None
+    caches_dropped = False
+    if control:
+        saved, failures = apply_controls(root, governor, disable_turbo)
+        if test.startswith("disk_"):
+            try:
+                drop_caches(root)
+                caches_dropped = True
+            except OSError as e:
+                failures.append(f"Could not drop caches: {e}")
+
+    record = {
+        "test": test,
+        "timestamp": datetime.now().isoformat(),
+        "controlled": control,
+        "governors": read_governors(root),
+        "turbo": read_turbo(root),
+        "caches_dropped": caches_dropped,
+        "activity": sample_activity(root, idle_seconds),
+        "control_failures": failures,
+    }
+    record["noise"] = noise_sources(record, idle_threshold)
+
+    # Keep the record per test so a rerun replaces the earlier entry
+    records = {}
+    try:
+        with open(results_file, "r") as f:
+            records = json.load(f)
+    except (OSError, ValueError):
+        pass
+    records[test] = record
+    with open(results_file, "w") as f:
+        json.dump(records, f, indent=2)
+
+    if saved:
+        with open(state_file, "w") as f:
+            json.dump(saved, f)
+
+    for line in record["noise"]:
+        print(f"Preflight warning: {line}")
+    return record
+
+
+def end_test(state_file, root="/"):
+    """Restore the environment saved by begin_test"""
+    try:
+        with open(state_file, "r") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    restore_controls(root, saved)
+    os.remove(state_file)
+
+
+def load_preflight(file_path):
+    """Load the preflight records per test, returning {} if unavailable"""
+    try:
+        with open_result(file_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record and control the benchmark environment around a test"
+    )
+    parser.add_argument("action", choices=["begin", "end"], help="Test phase")
+    parser.add_argument("test", help="Name of the test")
+    parser.add_argument(
+        "--results",
+        default="report/results/preflight.json",
+        help="Preflight records (default: report/results/preflight.json)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default="report/preflight_saved.json",
+        help="Saved settings to restore (default: report/preflight_saved.json)",
+    )
+    parser.add_argument("--root", default="/", help="Root containing proc/ and sys/")
+    parser.add_argument(
+        "--control",
+        action="store_true",
+        default=os.environ.get(CONTROL_ENV, "").lower() in ["1", "true", "yes"],
+        help=f"Set governor and turbo, drop caches before disk tests "
+        f"(default: ${CONTROL_ENV})",
+    )
+    parser.add_argument(
+        "--governor", default="performance", help="Governor to set when controlling"
+    )
+    parser.add_argument(
+        "--keep-turbo", action="store_true", help="Leave turbo enabled"
+    )
+    parser.add_argument(
+        "--idle-seconds",
+        type=float,
+        default=2.0,
+        help="Seconds to sample system activity (default: 2)",
+    )
+    parser.add_argument(
+        "--idle-threshold",
+        type=float,
+        default=10.0,
+        help="Maximum CPU busy percentage for an idle system (default: 10)",
+    )
+
+    args = parser.parse_args()
+
+    if args.action == "end":
+        end_test(args.state_file, args.root)
+        return
+
+    for path in [args.results, args.state_file]:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    begin_test(
+        args.test,
+        args.results,
+        args.state_file,
+        root=args.root,
+        control=args.control,
+        governor=args.governor,
+        disable_turbo=not args.keep_turbo,
+        idle_seconds=args.idle_seconds,
+        idle_threshold=args.idle_threshold,
+    )
+
+
+if __name__ == "__main__":
+    main()
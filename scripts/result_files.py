@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import zipfile
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Large raw outputs that are worth compressing, derived JSON/CSV stay plain
+COMPRESSIBLE = (".yaml", ".log")
+
+EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+INDEX_NAME = "index.json"
+
+
+def default_format():
+    """Compression format from STRESS_COMPRESS, zstd when available"""
+    fmt = os.environ.get("STRESS_COMPRESS")
+    if fmt:
+        return fmt
+    return "zstd" if zstandard else "gzip"
+
+
+def _split_bundle(path):
+    """Split "runs/run.zip/cpu_single.yaml" into the bundle and member name"""
+    parts = path.replace(os.sep, "/").split("/")
+    for i in range(len(parts) - 1, 0, -1):
+        bundle = "/".join(parts[:i])
+        if bundle.endswith(".zip") and os.path.isfile(bundle):
+            return bundle, "/".join(parts[i:])
+    return None, None
+
+
+def _candidates(name):
+    return [name, name + EXTENSIONS["zstd"], name + EXTENSIONS["gzip"]]
+
+
+def find_result(path):
+    """
+    Find a result file that may have been compressed or archived
+
+    Args:
+        path (str): Uncompressed result path, e.g. report/results/cpu_single.yaml
+
+    Returns:
+        str: Path of the stored file (plain, .zst, .gz or a member inside a
+            .zip bundle), or None if it does not exist
+    """
+    for candidate in _candidates(path):
+        if os.path.isfile(candidate):
+            return candidate
+
+    bundle, member = _split_bundle(path)
+    if bundle:
+        with zipfile.ZipFile(bundle) as zf:
+            names = set(zf.namelist())
+        for candidate in _candidates(member):
+            if candidate in names:
+                return f"{bundle}/{candidate}"
+    return None
+
+
+def result_exists(path):
+    return find_result(path) is not None
+
+
+def _close_with(stream, *others):
+    """Make closing stream also close the streams it reads from"""
+    stream_close = stream.close
+
+    def close():
+        stream_close()
+        for other in others:
+            other.close()
+
+    stream.close = close
+    return stream
+
+
+def _decompress_stream(raw, name):
+    if name.endswith(EXTENSIONS["gzip"]):
+        return _close_with(gzip.GzipFile(fileobj=raw, mode="rb"), raw)
+    if name.endswith(EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raw.close()
+            raise OSError(f"Reading {name} requires the zstandard Python package")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.BufferedReader(reader)
+    return raw
+
+
+def open_result(path, binary=False):
+    """
+    Open a result file for reading, decompressing it while streaming
+
+    Nothing is inflated to disk, compressed files and archive members are
+    decompressed chunk by chunk as the caller reads.
+
+    Args:
+        path (str): Uncompressed result path
+        binary (bool): Return a binary stream instead of text
+
+    Raises:
+        FileNotFoundError: If no plain, compressed or archived copy exists
+    """
+    stored = find_result(path)
+    if stored is None:
+        raise FileNotFoundError(f"No such result file: '{path}'")
+
+    bundle, member = _split_bundle(stored)
+    if bundle and not os.path.isfile(stored):
+        zf = zipfile.ZipFile(bundle)
+        raw = _close_with(zf.open(member), zf)
+    else:
+        raw = open(stored, "rb")
+
+    stream = _decompress_stream(raw, stored)
+    if binary:
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+
+
+def compress_file(path, fmt=None, level=None):
+    """
+    Compress a file in place, replacing it with a .zst or .gz copy
+
+    Returns:
+        str: Path of the compressed file
+    """
+    fmt = fmt or default_format()
+    if fmt == "zstd" and zstandard is None:
+        print("Warning: zstandard not installed, using gzip", file=sys.stderr)
+        fmt = "gzip"
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Unknown compression format '{fmt}'")
+
+    output = path + EXTENSIONS[fmt]
+    tmp_output = f"{output}.tmp"
+    with open(path, "rb") as src, open(tmp_output, "wb") as dst:
+        if fmt == "zstd":
+            compressor = zstandard.ZstdCompressor(level=level or 10)
+            with compressor.stream_writer(dst, closefd=False) as writer:
+                shutil.copyfileobj(src, writer, 1 << 20)
+        else:
+            with gzip.GzipFile(
+                fileobj=dst, mode="wb", compresslevel=level or 6
+            ) as writer:
+                shutil.copyfileobj(src, writer, 1 << 20)
+    shutil.copystat(path, tmp_output)
+    os.replace(tmp_output, output)
+    os.remove(path)
+    return output
+
+
+def compress_results(results_dir, fmt=None, level=None):
+    """
+    Compress every large raw output in a results directory
+
+    Runs after the tests, the tools write their output uncompressed.
+    """
+    fmt = fmt or default_format()
+    if fmt == "none":
+        return []
+    compressed = []
+    for name in sorted(os.listdir(results_dir)):
+        path = os.path.join(results_dir, name)
+        if os.path.isfile(path) and name.endswith(COMPRESSIBLE):
+            compressed.append(compress_file(path, fmt, level))
+    return compressed
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def archive_results(results_dir, bundle, fmt=None, level=None):
+    """
+    Archive a finished run into a single indexed .zip bundle
+
+    Raw outputs are compressed first and stored as-is, the remaining small
+    files are deflated. The zip central directory lets readers open any
+    member without reading the rest, and index.json lists every file with
+    its size and checksum plus the run summary and host fingerprint.
+    """
+    compress_results(results_dir, fmt, level)
+
+    files = []
+    for name in sorted(os.listdir(results_dir)):
+        path = os.path.join(results_dir, name)
+        if os.path.isfile(path):
+            files.append(
+                {"name": name, "size": os.path.getsize(path), "sha256": _sha256(path)}
+            )
+
+    index = {"created": datetime.now().isoformat(), "files": files}
+    metadata = [("summary", "results_summary.json"), ("system", "system_info.json")]
+    for key, name in metadata:
+        try:
+            with open(os.path.join(results_dir, name), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if key == "summary":
+            index["passed"] = data.get("passed")
+            index["counts"] = data.get("counts")
+        else:
+            index["fingerprint"] = data.get("fingerprint")
+
+    tmp_bundle = f"{bundle}.tmp"
+    with zipfile.ZipFile(tmp_bundle, "w") as zf:
+        zf.writestr(INDEX_NAME, json.dumps(index, indent=2))
+        for entry in files:
+            name = entry["name"]
+            already_compressed = name.endswith(tuple(EXTENSIONS.values()))
+            zf.write(
+                os.path.join(results_dir, name),
+                name,
+                zipfile.ZIP_STORED if already_compressed else zipfile.ZIP_DEFLATED,
+            )
+    os.replace(tmp_bundle, bundle)
+    return index
+
+
+def read_index(bundle):
+    with zipfile.ZipFile(bundle) as zf:
+        with zf.open(INDEX_NAME) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compress, archive and read stress test result files"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compress_parser = subparsers.add_parser(
+        "compress", help="Compress the raw outputs in a results directory"
+    )
+    compress_parser.add_argument("results_dir", help="Results directory")
+
+    archive_parser = subparsers.add_parser(
+        "archive", help="Archive a results directory as an indexed bundle"
+    )
+    archive_parser.add_argument("results_dir", help="Results directory")
+    archive_parser.add_argument("bundle", help="Output .zip bundle")
+
+    for sub in [compress_parser, archive_parser]:
+        sub.add_argument(
+            "--format",
+            choices=["zstd", "gzip", "none"],
+            help="Compression format (default: $STRESS_COMPRESS or zstd)",
+        )
+        sub.add_argument("--level", type=int, help="Compression level")
+
+    index_parser = subparsers.add_parser("index", help="Print a bundle index")
+    index_parser.add_argument("bundle", help=".zip bundle")
+
+    cat_parser = subparsers.add_parser(
+        "cat", help="Print a result file, decompressing it on the fly"
+    )
+    cat_parser.add_argument(
+        "path",
+        help="Result path, e.g. report/results/cpu_single.yaml or run.zip/<file>",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "cat":
+        try:
+            with open_result(args.path, binary=True) as f:
+                shutil.copyfileobj(f, sys.stdout.buffer)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.command == "index":
+        print(json.dumps(read_index(args.bundle), indent=2))
+        return
+
+    fmt = args.format or default_format()
+    if args.command == "compress":
+        for path in compress_results(args.results_dir, fmt, args.level):
+            print(f"Compressed {path}")
+    else:
+        index = archive_results(args.results_dir, args.bundle, fmt, args.level)
+        print(f"Archived {len(index['files'])} files to {args.bundle}")
+
+
+if __name__ == "__main__":
+    main()
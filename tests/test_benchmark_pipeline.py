@@ -0,0 +1,19 @@
+import benchmark_pipeline
+from benchmark_pipeline import measure_case, missing_dependencies
+
+
+def test_missing_optional_dependency(monkeypatch):
+    monkeypatch.setattr(
+        benchmark_pipeline,
+        "OPTIONAL_DEPENDENCIES",
+        {"generate_plots": ["json", "no_such_package"]},
+    )
+    assert missing_dependencies("generate_plots") == ["no_such_package"]
+    assert missing_dependencies("extract_gpu_data") == []
+
+
+def test_failing_case_is_an_error(tmp_path):
+    # No fixtures in the workdir, so the case raises instead of being skipped
+    result = measure_case("get_bogo_ops", str(tmp_path))
+    assert "seconds" not in result
+    assert "FileNotFoundError" in result["error"]
@@ -0,0 +1,67 @@
+from check_results import FAIL, PASS, evaluate_results, load_thresholds
+from generate_report import create_summary_md
+
+CPU_RESULT = """\
+metrics:
+  - stressor: cpu
+    bogo-ops: 1000
+    bogo-ops-per-second-real-time: 100.0
+    bogo-ops-per-second-usr-sys-time: 100.0
+    wall-clock-time: 10.0
+"""
+
+
+def write_thresholds(tmp_path, text):
+    path = tmp_path / "thresholds.yaml"
+    path.write_text(text)
+    return str(path)
+
+
+def test_null_limits_keep_defaults(tmp_path):
+    config = write_thresholds(
+        tmp_path,
+        "defaults:\n"
+        "  min_bogo_ops_per_second: 500\n"
+        "  max_avg_power_w: null\n"
+        "tests:\n"
+        "  cpu_single:\n"
+        "    min_bogo_ops_per_second: null\n"
+        "  cpu_multi:\n"
+        "    min_bogo_ops_per_second: 50\n"
+        "  gpu_burn:\n"
+        "    min_gflops: null\n"
+        "    max_temperature: 85\n",
+    )
+    thresholds = load_thresholds(config)
+    assert thresholds["cpu_single"] == {"min_bogo_ops_per_second": 500}
+    assert thresholds["cpu_multi"] == {"min_bogo_ops_per_second": 50}
+    assert thresholds["mem_single"] == {"min_bogo_ops_per_second": 500}
+    assert thresholds["gpu_burn"] == {"max_temperature": 85}
+
+
+def test_report_summary_matches_check_results(tmp_path):
+    results_dir = tmp_path / "results"
+    src_dir = tmp_path / "src"
+    results_dir.mkdir()
+    src_dir.mkdir()
+    (results_dir / "cpu_single.yaml").write_text(CPU_RESULT)
+    (results_dir / "cpu_multi.yaml").write_text(CPU_RESULT)
+    thresholds = load_thresholds(
+        write_thresholds(
+            tmp_path,
+            "tests:\n  cpu_multi:\n    min_bogo_ops_per_second: 500\n",
+        )
+    )
+
+    records = {r["test"]: r for r in evaluate_results(str(results_dir), thresholds)}
+    assert records["cpu_single"]["status"] == PASS
+    assert records["cpu_multi"]["status"] == FAIL
+
+    create_summary_md(str(results_dir), str(src_dir), thresholds)
+    rows = {
+        line.split("|")[1].strip(): line.split("|")[2].strip()
+        for line in (src_dir / "chapter_summary.md").read_text().splitlines()[3:]
+    }
+    for record in records.values():
+        expected = "✅" if record["status"] == PASS else "❌"
+        assert rows[record["name"]] == expected
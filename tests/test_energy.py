@@ -0,0 +1,70 @@
+import pytest
+
+from energy import EnergyMeter, counter_delta, find_domains
+
+MAX_ENERGY_UJ = 262143328850
+
+
+def add_zone(sysfs_root, zone, name, energy_uj=None, max_energy_uj=MAX_ENERGY_UJ):
+    zone_dir = sysfs_root / "class" / "powercap" / zone
+    zone_dir.mkdir(parents=True)
+    (zone_dir / "name").write_text(f"{name}\n")
+    if energy_uj is not None:
+        (zone_dir / "energy_uj").write_text(f"{energy_uj}\n")
+    if max_energy_uj is not None:
+        (zone_dir / "max_energy_range_uj").write_text(f"{max_energy_uj}\n")
+    return zone_dir
+
+
+@pytest.fixture
+def sysfs_root(tmp_path):
+    root = tmp_path / "sys"
+    add_zone(root, "intel-rapl:0", "package-0", 1000)
+    add_zone(root, "intel-rapl:0:0", "core", 400)
+    add_zone(root, "intel-rapl:0:1", "dram", 200, max_energy_uj=65532610987)
+    add_zone(root, "intel-rapl:1", "package-1", 3000)
+    add_zone(root, "intel-rapl:1:0", "dram", 500, max_energy_uj=None)
+    # Counter not readable, e.g. root-only on this kernel
+    add_zone(root, "intel-rapl:2", "psys")
+    return root
+
+
+def test_find_domains(sysfs_root):
+    domains = {domain["name"]: domain for domain in find_domains(str(sysfs_root))}
+    assert sorted(domains) == ["core-0", "dram-0", "dram-1", "package-0", "package-1"]
+    assert domains["package-0"]["zone"] == "intel-rapl:0"
+    assert domains["package-0"]["max_energy_uj"] == MAX_ENERGY_UJ
+    assert domains["dram-0"]["zone"] == "intel-rapl:0:1"
+    assert domains["dram-0"]["max_energy_uj"] == 65532610987
+    assert domains["dram-1"]["max_energy_uj"] is None
+    assert domains["package-1"]["energy_file"].endswith("intel-rapl:1/energy_uj")
+
+
+def test_find_domains_without_rapl(tmp_path):
+    assert find_domains(str(tmp_path)) == []
+
+
+def test_counter_delta_wraparound():
+    assert counter_delta(1000, 1500, MAX_ENERGY_UJ) == 500
+    assert counter_delta(MAX_ENERGY_UJ - 100, 50, MAX_ENERGY_UJ) == 151
+    assert counter_delta(MAX_ENERGY_UJ, 0, MAX_ENERGY_UJ) == 1
+    # Without a known range a wrapped reading cannot be measured
+    assert counter_delta(1000, 10, None) == 0
+
+
+def test_meter_accumulates_across_wraparound(tmp_path):
+    root = tmp_path / "sys"
+    zone_dir = add_zone(root, "intel-rapl:0", "package-0", MAX_ENERGY_UJ - 1000000)
+    meter = EnergyMeter(str(root))
+    meter.sample()
+    (zone_dir / "energy_uj").write_text("2000000\n")
+    meter.sample()
+    (zone_dir / "energy_uj").write_text("5000000\n")
+    meter.sample()
+    meter.elapsed = 2.0
+
+    results = meter.results()
+    assert results["available"]
+    assert results["package_joules"] == pytest.approx(6.000001)
+    assert results["dram_joules"] is None
+    assert results["avg_power_w"] == pytest.approx(3.0000005)
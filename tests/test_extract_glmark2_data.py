@@ -0,0 +1,105 @@
+import os
+import statistics
+
+import pytest
+
+from extract_glmark2_data import extract_plot_data, parse_glmark2_output
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def single_run():
+    return parse_glmark2_output(os.path.join(FIXTURES, "glmark2_single_run.log"))
+
+
+@pytest.fixture
+def two_runs():
+    return parse_glmark2_output(os.path.join(FIXTURES, "glmark2_two_runs.log"))
+
+
+def scene(data, test_name):
+    return next(s for s in data["scenes"] if s["test_name"] == test_name)
+
+
+def test_single_run(single_run):
+    assert single_run["runs"] == 1
+    assert single_run["scores"] == [1917]
+    assert single_run["overall_score"] == 1917
+    assert "score_stddev" not in single_run
+    assert single_run["opengl_info"]["vendor"] == "Intel"
+    assert single_run["opengl_info"]["version"].startswith("4.6")
+    assert len(single_run["test_results"]) == 33
+    assert single_run["summary"]["total_tests"] == 33
+    assert single_run["summary"]["min_fps"] == 214
+    assert single_run["summary"]["max_fps"] == 2881
+    assert all(s["runs"] == 1 and s["fps_stddev"] is None for s in single_run["scenes"])
+
+
+def test_groups_by_scene_and_options(single_run):
+    # Same scene with different options stays separate
+    build = [s for s in single_run["scenes"] if s["scene"] == "build"]
+    assert [s["options"] for s in build] == ["use-vbo=false", "use-vbo=true"]
+    assert [s["fps_mean"] for s in build] == [2458, 2789]
+
+    # Options containing ":" and ";" are kept whole
+    blur = scene(
+        single_run,
+        "desktop blur-radius=5:effect=blur:passes=1:separable=true:windows=4",
+    )
+    assert blur["fps_mean"] == 1094
+    assert blur["frame_time_ms_mean"] == 0.914
+    kernel = scene(single_run, "effect2d kernel=0,1,0;1,-4,1;0,1,0;")
+    assert kernel["fps_mean"] == 1441
+
+    # Scenes run with default options are labelled by the scene alone
+    terrain = scene(single_run, "terrain")
+    assert terrain["options"] == "<default>"
+    assert terrain["fps_mean"] == 214
+
+
+def test_two_runs(two_runs):
+    assert two_runs["runs"] == 2
+    assert two_runs["scores"] == [7289, 7301]
+    assert two_runs["overall_score"] == 7295
+    assert two_runs["score_stddev"] == pytest.approx(statistics.stdev([7289, 7301]))
+    assert two_runs["opengl_info"]["surface_size"] == "800x600 windowed"
+    assert len(two_runs["test_results"]) == 12
+    assert [r["run"] for r in two_runs["test_results"]] == [0] * 6 + [1] * 6
+
+    assert len(two_runs["scenes"]) == 6
+    assert all(s["runs"] == 2 for s in two_runs["scenes"])
+
+    build = scene(two_runs, "build use-vbo=false")
+    assert build["fps_mean"] == 9200
+    assert build["fps_stddev"] == pytest.approx(statistics.stdev([9120, 9280]))
+    assert build["frame_time_ms_mean"] == pytest.approx(0.109)
+
+    blur = scene(
+        two_runs,
+        "desktop blur-radius=5:effect=blur:passes=1:separable=true:windows=4",
+    )
+    assert blur["fps_mean"] == 4200
+    assert blur["fps_stddev"] == pytest.approx(statistics.stdev([4210, 4190]))
+
+
+def test_plot_data_keeps_full_labels(single_run, two_runs):
+    plot_data = extract_plot_data(single_run)
+    assert plot_data["test_names"] == [s["test_name"] for s in single_run["scenes"]]
+    assert len(set(plot_data["test_names"])) == 33
+    assert (
+        "buffer columns=200:interleave=false:update-dispersion=0.9"
+        ":update-fraction=0.5:update-method=subdata"
+    ) in plot_data["test_names"]
+
+    plot_data = extract_plot_data(two_runs)
+    index = plot_data["test_names"].index("build use-vbo=false")
+    assert plot_data["fps_values"][index] == 9200
+    assert plot_data["fps_stddev"][index] == pytest.approx(113.1, abs=0.1)
+
+
+def test_missing_log(tmp_path):
+    data = parse_glmark2_output(str(tmp_path / "glmark2.log"))
+    assert data["runs"] == 0
+    assert data["scenes"] == []
+    assert data["overall_score"] is None
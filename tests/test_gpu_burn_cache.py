@@ -0,0 +1,89 @@
+import os
+import subprocess
+
+import pytest
+
+from gpu_burn_cache import get_build
+
+# Stand-in for "make", creates the artifacts and counts the builds
+STUB_BUILD = "sh -c 'touch gpu_burn compare.ptx && echo built >> ../../../builds.log'"
+FAILED_BUILD = "sh -c 'touch gpu_burn && exit 1'"
+STUB_TOOLCHAIN = "echo stub-nvcc 12.0"
+
+
+@pytest.fixture
+def source_repo(tmp_path):
+    repo = tmp_path / "gpu-burn-src"
+    repo.mkdir()
+    (repo / "Makefile").write_text("all:\n")
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+    git("init", "--quiet")
+    git("add", "Makefile")
+    git(
+        "-c",
+        "user.name=test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "--quiet",
+        "-m",
+        "Initial commit",
+    )
+    return str(repo)
+
+
+def build_count(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "builds.log")) as f:
+            return len(f.readlines())
+    except OSError:
+        return 0
+
+
+def test_reuses_cached_build(tmp_path, source_repo):
+    cache_dir = str(tmp_path / "cache")
+    options = dict(
+        cache_dir=cache_dir,
+        url=source_repo,
+        compute="8.6",
+        build_cmd=STUB_BUILD,
+        toolchain_cmd=STUB_TOOLCHAIN,
+    )
+
+    build_dir, reused = get_build(**options)
+    assert not reused
+    assert build_count(cache_dir) == 1
+    assert sorted(os.listdir(build_dir)) == ["build.json", "compare.ptx", "gpu_burn"]
+    assert os.path.basename(build_dir).startswith("sm86-")
+
+    second_dir, reused = get_build(**options)
+    assert reused
+    assert second_dir == build_dir
+    assert build_count(cache_dir) == 1
+
+    third_dir, reused = get_build(**options, rebuild=True)
+    assert not reused
+    assert third_dir == build_dir
+    assert build_count(cache_dir) == 2
+
+    # A different compute capability gets its own build
+    other_dir, reused = get_build(**{**options, "compute": "7.5"})
+    assert not reused
+    assert other_dir != build_dir
+    assert build_count(cache_dir) == 3
+
+
+def test_failed_build_leaves_no_partial_directory(tmp_path, source_repo):
+    cache_dir = str(tmp_path / "cache")
+    with pytest.raises(subprocess.CalledProcessError):
+        get_build(
+            cache_dir=cache_dir,
+            url=source_repo,
+            compute="8.6",
+            build_cmd=FAILED_BUILD,
+            toolchain_cmd=STUB_TOOLCHAIN,
+        )
+    assert os.listdir(os.path.join(cache_dir, "builds")) == []
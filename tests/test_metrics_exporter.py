@@ -0,0 +1,93 @@
+import threading
+import urllib.request
+
+from metrics_exporter import (
+    CONTENT_TYPE,
+    MetricsCollector,
+    format_metrics,
+    make_server,
+    mark_stage,
+)
+
+CPU_RESULT = """\
+metrics:
+  - stressor: cpu
+    bogo-ops: 123456789
+    bogo-ops-per-second-real-time: 2057.614
+    bogo-ops-per-second-usr-sys-time: 2100.5
+    wall-clock-time: 60.0
+"""
+
+
+def test_serves_openmetrics(tmp_path):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    (results_dir / "cpu_single.yaml").write_text(CPU_RESULT)
+    (results_dir / "gpu_burn.log").write_text(
+        "50.0%  proc'd: 10 (5000 Gflop/s)   errors: 0   temps: 71 C \n"
+    )
+    state_file = str(tmp_path / "exporter_state.json")
+    mark_stage(state_file, "cpu_multi", 60)
+
+    collector = MetricsCollector(str(results_dir), state_file)
+    collector.refresh()
+    server = make_server(collector, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type == CONTENT_TYPE
+    lines = body.splitlines()
+    assert lines[-1] == "# EOF"
+    assert body.endswith("# EOF\n")
+    assert "# TYPE stress_test_current info" in lines
+    assert "# HELP stress_test_current Test that is currently running" in lines
+    assert "# TYPE stress_test_passed gauge" in lines
+    assert 'stress_test_current_info{test="cpu_multi"} 1' in lines
+    assert 'stress_test_passed{test="cpu_single"} 1' in lines
+    assert 'stress_test_bogo_ops{test="cpu_single"} 123456789' in lines
+    assert 'stress_test_bogo_ops_per_second{test="cpu_single"} 2057.614' in lines
+    assert "stress_test_gpu_gflops 5000.0" in lines
+    assert "stress_test_gpu_temperature_celsius 71.0" in lines
+    # Tests without results are left out rather than reported as failed
+    assert not any('stress_test_passed{test="cpu_multi"}' in line for line in lines)
+
+    # Every sample belongs to the family declared before it
+    family = None
+    for line in lines[:-1]:
+        if line.startswith("# TYPE "):
+            family = line.split()[2]
+        elif not line.startswith("#"):
+            assert family and line.startswith(family)
+
+
+def test_non_finite_values():
+    results = [
+        {
+            "test": "cpu_single",
+            "status": "pass",
+            "reasons": [],
+            "metrics": {
+                "bogo_ops": float("nan"),
+                "bogo_ops_per_second": float("inf"),
+                "score": float("-inf"),
+            },
+        }
+    ]
+    lines = format_metrics(None, None, results).splitlines()
+    assert 'stress_test_bogo_ops{test="cpu_single"} NaN' in lines
+    assert 'stress_test_bogo_ops_per_second{test="cpu_single"} +Inf' in lines
+    assert 'stress_test_glmark2_score{test="cpu_single"} -Inf' in lines
+
+
+def test_label_escaping():
+    state = {"test": 'say "hi"\\now', "started": 0}
+    lines = format_metrics(state, None, []).splitlines()
+    assert 'stress_test_current_info{test="say \\"hi\\"\\\\now"} 1' in lines
@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from plot_data import plot_glmark2  # noqa: E402
+
+
+def test_glmark2_score_without_scenes(tmp_path):
+    # Truncated log: glmark2 printed its score but no scene was parsed
+    (tmp_path / "glmark2_plot_data.json").write_text(
+        json.dumps({"test_names": [], "fps_values": [], "fps_stddev": []})
+    )
+    (tmp_path / "glmark2_data.json").write_text(
+        json.dumps({"overall_score": 1917, "opengl_info": {"renderer": "Mesa"}})
+    )
+
+    plot_glmark2(str(tmp_path), str(tmp_path))
+
+    assert (tmp_path / "glmark2_score.png").exists()
+    assert not (tmp_path / "glmark2_benchmark.png").exists()